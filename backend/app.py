@@ -1,22 +1,51 @@
+import logging
+
 from flask import Flask
 from flask_cors import CORS
-from database import init_db, db
+from cli import players_cli
+from config import Config
+from database import engine_options, init_db, db
+from routes.job_routes import jobs_bp
+from routes.metrics_routes import metrics_bp
 from routes.player_routes import player_bp
+from routes.players_routes import players_bp
+from services.fast_json import FastJSONProvider
+from services.http_cache import compress_response
+from services.rescorer import rescorer
 
 def create_app():
+    logging.basicConfig(
+        level=Config.LOG_LEVEL,
+        format='%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'
+    )
+
     app = Flask(__name__)
-    CORS(app)
+    app.json = FastJSONProvider(app)
+    # Only the API is cross-origin; preflights are cached by the browser.
+    CORS(app, resources={r'/api/*': {'origins': Config.CORS_ORIGINS}}, max_age=Config.CORS_MAX_AGE)
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://postgres:postgres@db:5432/football_stats'
+    app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(Config.SQLALCHEMY_DATABASE_URI)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     init_db(app)
 
     app.register_blueprint(player_bp, url_prefix='/api/player')
+    app.register_blueprint(players_bp, url_prefix='/api/players')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(metrics_bp)
+    app.after_request(compress_response)
+    app.cli.add_command(players_cli)
 
     return app
 
-app = create_app()
+# Pool processes started with forkserver or spawn re-import the script that
+# started the parent as __mp_main__; under `python app.py` that is this
+# file, and they need no app, database or background threads of their own.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (gunicorn.conf.py).
+    rescorer.start(app)
     app.run(host='0.0.0.0', port=8000)
@@ -0,0 +1,255 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.player_analyzer import PlayerAnalyzer
+
+REPORTS_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'scouting_reports.json')
+
+logger = logging.getLogger(__name__)
+
+# Times PlayerAnalyzer on the saved scouting reports: the previous multi-pass
+# analyze_player, the single-pass analyze_player over the stat profile index,
+# and analyze_many. All three must give the same output:
+#   python benchmarks/bench_analyzer.py --players 5000 --repeat 5
+
+class LegacyPlayerAnalyzer(PlayerAnalyzer):
+    # analyze_player before the stat profile index: every step rescans the
+    # report and tests membership against the stat lists.
+    def analyze_player(self, player_data):
+        try:
+            position = player_data['general_info']['position']
+            age = player_data['general_info']['age']
+            scouting_report = player_data['scouting_report']
+
+            position_base = self._get_position_base(position)
+            category_scores = self._calculate_category_scores(scouting_report, position_base)
+            strengths, weaknesses = self._identify_strengths_weaknesses(scouting_report, position_base)
+            overall_rating = self._calculate_overall_rating(category_scores, position_base)
+            playing_style = self._analyze_playing_style(scouting_report, position, category_scores)
+
+            development_analysis = self._analyze_development_needs(
+                age,
+                weaknesses,
+                category_scores,
+                position_base
+            )
+
+            return {
+                "player_overview": {
+                    "overall_rating": overall_rating,
+                    "summary": self._generate_detailed_summary(
+                        player_data['general_info']['name'],
+                        position,
+                        age,
+                        overall_rating,
+                        category_scores,
+                        playing_style
+                    ),
+                    "performance_profile": {
+                        "category_scores": category_scores,
+                        "key_strengths": strengths[:3],
+                        "areas_for_improvement": weaknesses[:3],
+                        "playing_style": playing_style
+                    },
+                    "development_analysis": development_analysis,
+                    "potential": {
+                        "current_rating": overall_rating,
+                        "potential_rating": self._estimate_potential(age, overall_rating, category_scores),
+                        "development_timeframe": self._estimate_development_timeframe(age),
+                        "key_development_areas": development_analysis['priority_areas']
+                    }
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Error analyzing player: {str(e)}")
+            return {"error": "Could not analyze player"}
+
+    def _calculate_category_scores(self, scouting_report: List, position: str) -> Dict:
+        category_scores = {}
+
+        for category, config in self.categories.items():
+            relevant_stats = []
+            weighted_sum = 0
+            total_weight = 0
+
+            for stat in scouting_report:
+                if stat['stat'] in config.stats:
+                    # Apply individual stat weight
+                    stat_weight = self.key_stats.get(stat['stat'], 1.0)
+                    weighted_sum += stat['percentile'] * stat_weight
+                    total_weight += stat_weight
+                    relevant_stats.append(stat)
+
+            if relevant_stats:
+                score = weighted_sum / total_weight if total_weight > 0 else 0
+
+                weight = self.position_weights[position][category]
+
+                category_scores[category] = {
+                    "score": round(score),
+                    "weight": weight,
+                    "contribution": round(score * weight, 2)
+                }
+
+        return category_scores
+
+    def _identify_strengths_weaknesses(self, scouting_report: List, position: str) -> tuple:
+        position_weights = self.position_weights[position]
+
+        rated_stats = []
+        for stat in scouting_report:
+            for category, config in self.categories.items():
+                if stat['stat'] in config.stats:
+                    weight = position_weights[category]
+                    rated_stats.append({
+                        "stat": stat['stat'],
+                        "percentile": stat['percentile'],
+                        "value": stat['per_90'],
+                        "weighted_score": stat['percentile'] * weight,
+                        "category": category
+                    })
+                    break
+
+        rated_stats.sort(key=lambda x: x['weighted_score'], reverse=True)
+
+        strengths = [stat for stat in rated_stats if stat['percentile'] >= 75]
+        weaknesses = [stat for stat in rated_stats if stat['percentile'] <= 35]
+
+        return strengths, weaknesses
+
+    def _analyze_playing_style(self, scouting_report: List, position: str, category_scores: Dict) -> Dict:
+        characteristics = {
+            style: self._calculate_style_characteristic(scouting_report, relevant_stats)
+            for style, relevant_stats in self.style_groups.items()
+        }
+
+        styles = sorted(characteristics.items(), key=lambda x: x[1], reverse=True)
+
+        return {
+            "primary_style": styles[0][0].replace('_', ' ').title(),
+            "secondary_style": styles[1][0].replace('_', ' ').title(),
+            "style_characteristics": characteristics,
+            "position_specific_traits": self._identify_position_specific_traits(
+                scouting_report,
+                position
+            )
+        }
+
+    def _calculate_style_characteristic(self, scouting_report: List, relevant_stats: List) -> float:
+        relevant_values = [
+            stat['percentile'] for stat in scouting_report
+            if stat['stat'] in relevant_stats
+        ]
+        return sum(relevant_values) / len(relevant_values) if relevant_values else 0
+
+    def _identify_position_specific_traits(self, scouting_report: List, position: str) -> Dict:
+        base_position = self._get_position_base(position)
+        relevant_traits = self.position_traits.get(base_position, self.position_traits["MF"])
+
+        traits_analysis = {}
+
+        for trait_name, relevant_stats in relevant_traits.items():
+            trait_scores = []
+
+            for stat in scouting_report:
+                if stat['stat'] in relevant_stats:
+                    trait_scores.append(stat['percentile'])
+
+            if trait_scores:
+                avg_score = sum(trait_scores) / len(trait_scores)
+                traits_analysis[trait_name] = {
+                    "score": round(avg_score),
+                    "level": self._get_trait_level(avg_score),
+                    "percentile": round(avg_score)
+                }
+
+        return {
+            "position_role": self._determine_specific_role(traits_analysis, position),
+            "key_traits": traits_analysis
+        }
+
+    def _determine_specific_role(self, traits_analysis: Dict, position: str) -> str:
+        base_position = self._get_position_base(position)
+
+        sorted_traits = sorted(
+            traits_analysis.items(),
+            key=lambda x: x[1]['score'],
+            reverse=True
+        )
+
+        if sorted_traits:
+            primary_trait = sorted_traits[0][0]
+            return self.role_definitions.get(base_position, {}).get(primary_trait, "Complete Player")
+
+        return "Versatile Player"
+
+def load_players(path, count):
+    with open(path, encoding='utf-8') as f:
+        players = json.load(f)
+    return [players[i % len(players)] for i in range(count)]
+
+def time_per_player(func, players, repeat):
+    # Best of several runs with the collector paused, as timeit does; a
+    # single run is easily skewed by other load.
+    best = None
+    for _ in range(repeat):
+        results = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            results = func(players)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best / len(players)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark PlayerAnalyzer')
+    parser.add_argument('--fixture', default=REPORTS_FIXTURE)
+    parser.add_argument('--players', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    legacy = LegacyPlayerAnalyzer()
+    analyzer = PlayerAnalyzer()
+    players = load_players(args.fixture, args.players)
+
+    implementations = {
+        'legacy': lambda players: [legacy.analyze_player(player) for player in players],
+        'single_pass': lambda players: [analyzer.analyze_player(player) for player in players],
+        'analyze_many': analyzer.analyze_many
+    }
+
+    results = {}
+    expected = None
+    for name, func in implementations.items():
+        output, seconds = time_per_player(func, players, args.repeat)
+        encoded = json.dumps(output)
+        if expected is not None and encoded != expected:
+            print(f"{name} output differs from legacy")
+            return 1
+        expected = encoded
+        results[name] = seconds * 1e6
+
+    print(f"{len(players)} players, outputs identical")
+    print(f"{'implementation':<14}{'us/player':>10}")
+    for name, us in results.items():
+        print(f"{name:<14}{us:>10.1f}")
+    print(f"single_pass speedup x{results['legacy'] / results['single_pass']:.1f}, "
+          f"analyze_many speedup x{results['legacy'] / results['analyze_many']:.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.parse_pool import ParsePool
+from services.parse_worker import parse_page
+from services.player_analyzer import PlayerAnalyzer
+from services.player_page_parser import PlayerPageParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Parse + analyze throughput on the saved fbref player pages, with pages fed
+# from request threads the way gthread workers do. "threads" parses on the
+# calling threads (GIL-bound); "processes" sends the pages to a ParsePool:
+#   python benchmarks/bench_parse_pool.py --pages 400 --workers 1 2 4 8
+
+def load_pages(fixtures_dir):
+    pages = []
+    for filename in sorted(os.listdir(fixtures_dir)):
+        # comp-*.html and squad-*.html are stats tables, not player pages.
+        if filename.endswith('.html') and not filename.startswith(('comp-', 'squad-')):
+            with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+                pages.append((filename, f.read()))
+    return pages
+
+def run_threads(corpus, workers):
+    parser = PlayerPageParser()
+    analyzer = PlayerAnalyzer()
+    with ThreadPoolExecutor(max_workers=workers) as threads:
+        return list(threads.map(lambda html: parse_page(parser, analyzer, html)[0], corpus))
+
+def run_processes(corpus, workers):
+    pool = ParsePool(workers=workers)
+    try:
+        # Started before timing so process start-up is not counted.
+        pool.parse(corpus[0])
+        with ThreadPoolExecutor(max_workers=pool.max_pending) as threads:
+            start = time.perf_counter()
+            results = list(threads.map(lambda html: pool.parse(html)[0], corpus))
+            return results, time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark parsing pages in a process pool')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        print(f"No fixtures found in {args.fixtures}")
+        return 1
+
+    corpus = [pages[i % len(pages)][1] for i in range(args.pages)]
+    workers = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{len(corpus)} pages from {len(pages)} fixtures, {os.cpu_count()} CPUs")
+    if (os.cpu_count() or 1) < 2:
+        print("With one CPU the pool processes share it with the request threads: expect no speedup, "
+              "and leave PARSE_POOL_WORKERS at 0 on such hosts.")
+
+    start = time.perf_counter()
+    expected = run_threads(corpus, 1)
+    baseline = len(corpus) / (time.perf_counter() - start)
+
+    print(f"{'mode':<10}{'workers':>8}{'pages/s':>10}{'speedup':>9}")
+    print(f"{'serial':<10}{1:>8}{baseline:>10.1f}{1:>8.1f}x")
+    for count in workers:
+        start = time.perf_counter()
+        results = run_threads(corpus, count)
+        rate = len(corpus) / (time.perf_counter() - start)
+        print(f"{'threads':<10}{count:>8}{rate:>10.1f}{rate / baseline:>8.1f}x")
+
+        results, elapsed = run_processes(corpus, count)
+        if results != expected:
+            print(f"Process pool output differs from in-thread parsing with {count} workers")
+            return 1
+        rate = len(corpus) / elapsed
+        print(f"{'processes':<10}{count:>8}{rate:>10.1f}{rate / baseline:>8.1f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from services.player_page_parser import PlayerPageParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Compares the single-pass lxml extractor with the previous BeautifulSoup
+# extraction on the saved fbref pages:
+#   python benchmarks/bench_parser.py --repeat 20
+
+def legacy_parse(html, parser=PlayerPageParser()):
+    soup = BeautifulSoup(html, 'html.parser')
+    meta_div = soup.find('div', id='meta')
+    if not meta_div:
+        return None
+
+    birth_date_element = meta_div.find('span', id='necro-birth')
+    birth_date_text = birth_date_element.text.strip() if birth_date_element else None
+
+    player_info = {
+        'general_info': {
+            'photo_url': meta_div.find('img')['src'] if meta_div.find('img') else None,
+            'name': meta_div.find('h1').text.strip() if meta_div.find('h1') else None,
+            'position': next((p.text.split('▪')[0].replace('Position:', '').strip()
+                              for p in meta_div.find_all('p') if 'Position:' in p.text), None),
+            'age': parser.extract_age(birth_date_text),
+            'national_team': next((p.find('a').text.strip()
+                                   for p in meta_div.find_all('p') if 'National Team:' in p.text), None),
+            'club': next((p.find('a').text.strip()
+                          for p in meta_div.find_all('p') if 'Club:' in p.text), None),
+        }
+    }
+
+    stats_div = soup.find('div', class_='stats_pullout')
+    if stats_div:
+        competitions = [comp.text.strip() for comp in stats_div.select('div > div > p strong')
+                        if not comp.text.strip().startswith('20')]
+        columns = [
+            ('matches', 'div.p1 div:nth-child(1) p'),
+            ('minutes', 'div.p1 div:nth-child(2) p'),
+            ('goals', 'div.p1 div:nth-child(3) p'),
+            ('assists', 'div.p1 div:nth-child(4) p'),
+            ('expected_goals', 'div.p2 div:nth-child(1) p'),
+            ('non_penalty_xg', 'div.p2 div:nth-child(2) p'),
+            ('expected_assists', 'div.p2 div:nth-child(3) p'),
+            ('shot_creating_actions', 'div.p3 div:nth-child(1) p'),
+            ('goal_creating_actions', 'div.p3 div:nth-child(2) p')
+        ]
+        values = {key: [p.text.strip() for p in stats_div.select(selector)] for key, selector in columns}
+
+        current_season_stats = {}
+        for i, competition in enumerate(competitions):
+            try:
+                current_season_stats[competition] = {key: values[key][i] for key, _ in columns}
+            except Exception:
+                current_season_stats[competition] = {key: "0" for key, _ in columns}
+        player_info['current_season_stats'] = current_season_stats
+
+    scouting_report = []
+    scouting_divs = soup.find_all('div', id=lambda x: x and x.startswith('div_scout_summary_'))
+    if scouting_divs:
+        for row in scouting_divs[0].select('tbody tr'):
+            if 'spacer' in row.get('class', []):
+                continue
+            try:
+                scouting_report.append({
+                    'stat': row.find('th', {'data-stat': 'statistic'}).text.strip(),
+                    'per_90': row.find('td', {'data-stat': 'per90'}).text.strip(),
+                    'percentile': int(row.find('td', {'data-stat': 'percentile'}).select_one('div').text.strip())
+                })
+            except Exception:
+                continue
+    player_info['scouting_report'] = scouting_report
+
+    return player_info
+
+def single_pass_parse(html, parser=PlayerPageParser()):
+    return parser.parse(html)
+
+IMPLEMENTATIONS = {
+    'legacy': legacy_parse,
+    'single_pass': single_pass_parse
+}
+
+def load_pages(fixtures_dir):
+    pages = []
+    for filename in sorted(os.listdir(fixtures_dir)):
+        # comp-*.html and squad-*.html are stats tables, not player pages.
+        if filename.endswith('.html') and not filename.startswith(('comp-', 'squad-')):
+            with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+                pages.append((filename, f.read()))
+    return pages
+
+def quiet(func, *args):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return func(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def time_per_page(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            quiet(func, html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+def reset_peak_rss():
+    # Linux lets a process reset its own high-water mark; elsewhere the probe
+    # falls back to ru_maxrss, which also counts what the parent had used.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def peak_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def memory_probe(name, fixtures_dir):
+    # Run in a fresh interpreter so the peak only reflects this implementation,
+    # including memory allocated inside libxml2.
+    pages = load_pages(fixtures_dir)
+    reset_peak_rss()
+    baseline = peak_rss_kb()
+    peak = 0
+    for _, html in pages:
+        quiet(IMPLEMENTATIONS[name], html)
+        peak = max(peak, peak_rss_kb() - baseline)
+    print(json.dumps({'peak_kb': peak}))
+
+def peak_memory_kb(name, fixtures_dir):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--memory-probe', name, '--fixtures', fixtures_dir],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])['peak_kb']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark player page extraction')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--memory-probe', choices=IMPLEMENTATIONS.keys())
+    args = parser.parse_args(argv)
+
+    if args.memory_probe:
+        memory_probe(args.memory_probe, args.fixtures)
+        return 0
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        print(f"No fixtures found in {args.fixtures}")
+        return 1
+
+    for filename, html in pages:
+        if quiet(legacy_parse, html) != quiet(single_pass_parse, html):
+            print(f"Output mismatch for {filename}")
+            return 1
+
+    avg_size = sum(len(html) for _, html in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {avg_size:.0f} KiB average, outputs identical")
+    print(f"{'implementation':<14}{'ms/page':>10}{'peak RSS KiB':>14}")
+
+    results = {}
+    for name, func in IMPLEMENTATIONS.items():
+        results[name] = (time_per_page(func, pages, args.repeat) * 1000, peak_memory_kb(name, args.fixtures))
+        print(f"{name:<14}{results[name][0]:>10.2f}{results[name][1]:>14}")
+
+    legacy_ms, legacy_kb = results['legacy']
+    new_ms, new_kb = results['single_pass']
+    print(f"speedup x{legacy_ms / new_ms:.1f}, peak memory -{max(legacy_kb - new_kb, 0)} KiB")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
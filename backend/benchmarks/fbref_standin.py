@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fixture_server import make_server
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Serves the saved fbref pages in benchmarks/fixtures locally:
+#   python benchmarks/fbref_standin.py --port 8765
+#   FBREF_BASE_URL=http://localhost:8765 python app.py
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve saved fbref pages locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to wait before each response')
+    parser.add_argument('--no-conditional', action='store_true', help='omit ETag/Last-Modified and never answer 304')
+    parser.add_argument('--aliases', action='store_true',
+                        help='resolve "<player name> <anything>" searches to that player, for load_test.py misses')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.fixtures, args.port, args.delay, not args.no_conditional, args.aliases)
+    print(f"Serving {args.fixtures} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fixture_server import load_fixtures
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Drives the search endpoint of a running server and reports latency
+# percentiles and throughput. The hit path repeats a name that is already
+# stored; the miss path searches names nobody has looked up, so every request
+# creates a scrape job. Miss names are the fixture players' names plus a random
+# tag, which the stand-in only resolves when started with --aliases, so each
+# job scrapes a real player page. With --follow a miss is timed until its job
+# finishes, and a job that did not find its player counts as an error.
+# Point the server at benchmarks/fbref_standin.py (FBREF_BASE_URL) and raise
+# FBREF_RATE_LIMIT_PER_MINUTE so misses are not throttled:
+#   python benchmarks/fbref_standin.py --aliases
+#   python benchmarks/load_test.py --url http://localhost:8000 --path hit --concurrency 32
+#   python benchmarks/load_test.py --path miss --follow --requests 200
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def wait_for_job(session, base_url, status_url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = session.get(f"{base_url}{status_url}", timeout=timeout).json()
+        if not job.get('success') or job['data']['status'] in ('done', 'failed'):
+            return bool(
+                job.get('success') and job['data']['status'] == 'done'
+                and (job['data']['result'] or {}).get('success')
+            )
+        time.sleep(0.05)
+    return False
+
+def search(session, args, name):
+    response = session.get(f"{args.url}/api/player/search", params={'name': name}, timeout=args.timeout)
+    if response.status_code == 202 and args.follow:
+        return wait_for_job(session, args.url, response.json()['data']['status_url'], args.timeout)
+    return response.status_code in (200, 202)
+
+def worker(args, names, latencies, errors, lock, stop_at):
+    session = requests.Session()
+    while time.monotonic() < stop_at:
+        name = next(names)
+        if name is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            ok = search(session, args, name)
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors.append(name)
+
+class NameSource:
+    def __init__(self, path, hit_name, total, miss_names=()):
+        self.path = path
+        self.hit_name = hit_name
+        self.remaining = total
+        self.miss_names = itertools.cycle(miss_names)
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            if self.remaining is not None:
+                if self.remaining <= 0:
+                    return None
+                self.remaining -= 1
+            miss_name = next(self.miss_names)
+        if self.path == 'hit':
+            return self.hit_name
+        return f"{miss_name} {uuid.uuid4().hex[:12]}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test /api/player/search')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--path', choices=('hit', 'miss'), default='hit')
+    parser.add_argument('--name', default='Kylian Mbappe', help='stored player used by the hit path')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run when --requests is not set')
+    parser.add_argument('--requests', type=int, help='stop after this many requests')
+    parser.add_argument('--follow', action='store_true', help='time misses until their job finishes')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='fixture pages the miss path takes player names from')
+    args = parser.parse_args(argv)
+
+    if args.path == 'hit':
+        # Make sure the player is stored so every timed request is a hit.
+        try:
+            loaded = search(requests.Session(), argparse.Namespace(**{**vars(args), 'follow': True}), args.name)
+        except requests.RequestException:
+            loaded = False
+        if not loaded:
+            print(f"Could not load {args.name!r} for the hit path", file=sys.stderr)
+            return 1
+
+    miss_names = [slug.replace('-', ' ') for slug, _ in load_fixtures(args.fixtures).values()]
+    if args.path == 'miss' and not miss_names:
+        print(f"No fixture players in {args.fixtures} for the miss path", file=sys.stderr)
+        return 1
+
+    names = NameSource(args.path, args.name, args.requests, miss_names)
+    latencies, errors, lock = [], [], threading.Lock()
+    stop_at = time.monotonic() + (args.duration if args.requests is None else float('inf'))
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(args, names, latencies, errors, lock, stop_at))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"path={args.path} follow={args.follow} concurrency={args.concurrency}")
+    print(f"requests={len(latencies)} errors={len(errors)} elapsed={elapsed:.2f}s rps={len(latencies) / elapsed:.1f}")
+    if latencies:
+        print(
+            f"latency ms: p50={percentile(latencies, 0.50):.1f} p90={percentile(latencies, 0.90):.1f} "
+            f"p99={percentile(latencies, 0.99):.1f} max={max(latencies):.1f} mean={statistics.mean(latencies):.1f}"
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
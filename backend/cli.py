@@ -0,0 +1,273 @@
+import os
+import tempfile
+import threading
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy.orm import selectinload
+
+from config import Config
+from database import db
+from models.player import Player
+from services.competition_scraper import CompetitionScraper, SquadScraper
+from services.fbref_client import FbrefClient
+from services.fixture_server import make_server
+from services.page_cache import PageCache
+from services.player_analyzer import analyzers
+from services.player_scraper import PlayerScraper
+from services.player_service import PlayerService
+from services.player_warmer import PlayerWarmer
+from services.rate_limiter import FileTokenBucket
+from services.rescorer import rescorer
+from services.similarity_index import similarity_index
+from services.stat_history import stat_history
+
+players_cli = AppGroup('players', help='Manage stored players.')
+
+@players_cli.command('migrate-stats', help='Move stats from the legacy JSON columns into the typed tables.')
+@click.option('--batch-size', default=200, show_default=True, help='Players per transaction.')
+def migrate_stats(batch_size):
+    last_id = 0
+    migrated = 0
+    kept = 0
+
+    while True:
+        players = Player.query.filter(Player.id > last_id).order_by(Player.id).limit(batch_size).all()
+        if not players:
+            break
+
+        for player in players:
+            if player.current_season_stats is None and player.scouting_report is None:
+                continue
+            # The JSON is dropped once moved, so it stays where it is for any
+            # player whose stats the typed rows would not give back verbatim.
+            errors = player.stats_round_trip_errors()
+            if errors:
+                kept += 1
+                click.echo(f"Kept player {player.id} in JSON: {'; '.join(errors[:3])}")
+                continue
+            player.set_stats(player.current_season_stats, player.scouting_report)
+            migrated += 1
+
+        last_id = players[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+        click.echo(f"Migrated {migrated} players (up to id {last_id})")
+
+    click.echo(f"Done, {migrated} players migrated, {kept} kept in JSON")
+
+@players_cli.command('check-stats', help='Check that every stored player\'s stats render back exactly as scraped.')
+@click.option('--batch-size', default=500, show_default=True, help='Players per query.')
+def check_stats(batch_size):
+    last_id = 0
+    checked = 0
+    failed = 0
+
+    while True:
+        players = Player.query.options(
+            selectinload(Player.season_stats), selectinload(Player.scouting_stats)
+        ).filter(Player.id > last_id).order_by(Player.id).limit(batch_size).all()
+        if not players:
+            break
+
+        for player in players:
+            errors = player.stats_round_trip_errors()
+            if errors:
+                failed += 1
+                click.echo(f"Player {player.id} ({player.name}): {'; '.join(errors[:3])}")
+        checked += len(players)
+        last_id = players[-1].id
+        db.session.expunge_all()
+
+    click.echo(f"Checked {checked} players, {failed} do not round-trip")
+    if failed:
+        raise click.ClickException(f"{failed} players' stats do not round-trip")
+
+@players_cli.command('index-profiles', help='Fill the leaderboard columns of players stored before they existed.')
+@click.option('--batch-size', default=500, show_default=True, help='Players per transaction.')
+def index_profiles(batch_size):
+    last_id = 0
+    indexed = 0
+
+    while True:
+        players = Player.query.filter(Player.id > last_id).order_by(Player.id).limit(batch_size).all()
+        if not players:
+            break
+
+        for player in players:
+            player.index_profile()
+        indexed += len(players)
+
+        last_id = players[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+        click.echo(f"Indexed {indexed} players (up to id {last_id})")
+
+    click.echo(f"Done, {indexed} players indexed")
+
+@players_cli.command('build-similarity', help='Rebuild the similar-player index from the database and save it.')
+def build_similarity():
+    size = similarity_index.rebuild()
+    click.echo(f"Indexed {size} players into {similarity_index.directory}")
+
+@players_cli.command('reparse', help='Re-parse and re-analyze cached fbref pages without fetching them again.')
+@click.option('--batch-size', default=200, show_default=True, help='Players per transaction.')
+@click.option('--version', default=-1, show_default=True, help='Cached page version to parse, -1 is the latest.')
+def reparse(batch_size, version):
+    scraper = PlayerScraper()
+    last_id = 0
+    reparsed = 0
+    missing = 0
+
+    while True:
+        players = Player.query.filter(Player.id > last_id, Player.fbref_url.isnot(None)).order_by(
+            Player.id
+        ).limit(batch_size).all()
+        if not players:
+            break
+
+        updated = []
+        for player in players:
+            result = scraper.reparse_cached(player.fbref_url, analyze=True, version=version)
+            if not result['success']:
+                missing += 1
+                continue
+
+            data = result['data']
+            player.general_info = data['general_info']
+            player.set_stats(data.get('current_season_stats'), data.get('scouting_report'))
+            if data.get('player_overview'):
+                player.player_overview = data['player_overview']
+            if data.get('analysis_version'):
+                player.mark_analyzed(data['analysis_version'])
+            updated.append(player)
+
+        reparsed += len(updated)
+        last_id = players[-1].id
+        stat_history.record(updated)
+        db.session.commit()
+        similarity_index.update(updated)
+        db.session.expunge_all()
+        click.echo(f"Re-parsed {reparsed} players (up to id {last_id})")
+
+    click.echo(f"Done, {reparsed} players re-parsed, {missing} without a cached page")
+
+@players_cli.command('rescore', help='Re-analyze stored players whose analysis is from another analyzer version.')
+@click.option('--batch-size', default=Config.RESCORE_BATCH_SIZE, show_default=True, help='Players per transaction.')
+def rescore(batch_size):
+    rescorer.batch_size = batch_size
+    pending = rescorer.pending()
+    click.echo(f"{pending} players behind analyzer version {analyzers.current().version}")
+
+    def report(stats):
+        click.echo(f"Re-scored {stats['rescored']}/{pending} players, {stats['changed']} changed")
+
+    stats = rescorer.rescore_all(report)
+    click.echo(f"Done, {stats['rescored']} players re-scored, {stats['changed']} with a new overview")
+
+@players_cli.command('warm', help='Scrape and store players before anyone searches for them.')
+@click.option('--from', 'names_file', type=click.File('r', encoding='utf-8'), help='File with one player name per line.')
+@click.option('--league', help='Competition whose players to load, e.g. "Premier League".')
+@click.option('--concurrency', default=Config.WARM_CONCURRENCY, show_default=True, help='Players scraped at once.')
+@click.option('--batch-size', default=Config.WARM_BATCH_SIZE, show_default=True, help='Players per transaction.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Progress file; defaults to one per source.')
+@click.option('--fixtures', type=click.Path(exists=True, file_okay=False),
+              help='Serve fbref from a directory of saved pages instead of the network.')
+def warm(names_file, league, concurrency, batch_size, checkpoint, fixtures):
+    if bool(names_file) == bool(league):
+        raise click.UsageError('Pass exactly one of --from or --league')
+
+    client, service = _scraping_service(fixtures)
+
+    if names_file:
+        names = [line.strip() for line in names_file if line.strip() and not line.lstrip().startswith('#')]
+        items = [{'name': name} for name in names]
+        source = f"names:{os.path.abspath(names_file.name)}"
+    else:
+        try:
+            items = CompetitionScraper(client).players(league)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        source = f"league:{league.strip().lower()}"
+    if fixtures:
+        source += f"@{os.path.abspath(fixtures)}"
+
+    _warm(service, items, source, concurrency, batch_size, checkpoint)
+
+@players_cli.command('ingest', help="Load a league's or squad's season stats from one page, then fetch only "
+                                    "the players not stored yet.")
+@click.option('--league', help='Competition whose player stats page to load, e.g. "La Liga".')
+@click.option('--squad', help='fbref squad stats page URL; needs --competition.')
+@click.option('--competition', help='Competition of the squad page tables to load, e.g. "La Liga".')
+@click.option('--fetch-missing/--stats-only', default=True, show_default=True,
+              help='Fetch the profile of listed players that are not stored yet.')
+@click.option('--concurrency', default=Config.WARM_CONCURRENCY, show_default=True, help='Players scraped at once.')
+@click.option('--batch-size', default=Config.WARM_BATCH_SIZE, show_default=True, help='Players per transaction.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Progress file; defaults to one per source.')
+@click.option('--fixtures', type=click.Path(exists=True, file_okay=False),
+              help='Serve fbref from a directory of saved pages instead of the network.')
+def ingest(league, squad, competition, fetch_missing, concurrency, batch_size, checkpoint, fixtures):
+    if bool(league) == bool(squad):
+        raise click.UsageError('Pass exactly one of --league or --squad')
+    if squad and not competition:
+        raise click.UsageError('--squad needs --competition')
+
+    client, service = _scraping_service(fixtures)
+    try:
+        if league:
+            scraper = CompetitionScraper(client)
+            label = scraper.label(league)
+            rows = scraper.players(league)
+            source = f"league:{league.strip().lower()}"
+        else:
+            scraper = SquadScraper(client)
+            label = scraper.label(competition)
+            rows = scraper.players(squad, competition)
+            source = f"squad:{scraper.squad_path(squad)}:{competition.strip().lower()}"
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if fixtures:
+        source += f"@{os.path.abspath(fixtures)}"
+
+    result = service.upsert_season_stats(label, rows)
+    click.echo(
+        f"{result['listed']} players listed for {label}: {result['updated']} updated, "
+        f"{result['unchanged']} unchanged, {len(result['missing'])} not stored yet"
+    )
+    if fetch_missing and result['missing']:
+        _warm(service, result['missing'], source, concurrency, batch_size, checkpoint)
+
+def _scraping_service(fixtures):
+    client = _offline_client(fixtures) if fixtures else FbrefClient()
+    # Offline runs leave the real page cache alone.
+    page_cache = PageCache(enabled=False) if fixtures else None
+    return client, PlayerService(scraper=PlayerScraper(client=client, page_cache=page_cache))
+
+def _warm(service, items, source, concurrency, batch_size, checkpoint):
+    def report(stats):
+        done = stats['stored'] + stats['failed']
+        rate = done / stats['elapsed'] * 60 if stats['elapsed'] else 0.0
+        click.echo(
+            f"{done + stats['skipped'] + stats['resumed']}/{stats['total']} players: "
+            f"{stats['stored']} stored, {stats['failed']} failed, "
+            f"{stats['skipped'] + stats['resumed']} already done ({rate:.1f} players/min)"
+        )
+
+    warmer = PlayerWarmer(service, concurrency, batch_size, checkpoint)
+    stats = warmer.run(items, source, report)
+    click.echo(
+        f"Done in {stats['elapsed']:.1f}s: {stats['stored']} stored, {stats['failed']} failed, "
+        f"{stats['skipped']} already stored, {stats['resumed']} done by an earlier run"
+    )
+
+    for key, error in list(stats['failures'].items())[:20]:
+        click.echo(f"  failed {key}: {error}")
+    if len(stats['failures']) > 20:
+        click.echo(f"  ... and {len(stats['failures']) - 20} more")
+    click.echo(f"Checkpoint saved to {stats['checkpoint']}; re-run the same command to retry failures.")
+
+def _offline_client(fixtures):
+    server = make_server(fixtures)
+    threading.Thread(target=server.serve_forever, name='fbref-fixtures', daemon=True).start()
+    limiter = FileTokenBucket(os.path.join(tempfile.mkdtemp(), 'rate_limit.json'), 1000, 100, 30)
+    return FbrefClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", rate_limiter=limiter)
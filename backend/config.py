@@ -1,8 +1,159 @@
+import os
+
 class Config:
   DEBUG = True
+  LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
   
   CHROME_OPTIONS = [
     "--headless",
     "--no-sandbox",
     "--disable-dev-shm-usage"
-  ] 
\ No newline at end of file
+  ]
+
+  SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'DATABASE_URL', 'postgresql://postgres:postgres@db:5432/football_stats'
+  )
+  # Per process. Size it for the threads that can hold a connection at once:
+  # the gunicorn threads plus the scrape job and refresh workers. With
+  # SINGLE_FLIGHT_MODE=postgres, each scrape in progress also keeps one for
+  # its advisory lock, up to SCRAPE_JOB_WORKERS + BATCH_SCRAPE_WORKERS.
+  DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+  DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '5'))
+  DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+  DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+  DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+  FBREF_BASE_URL = os.environ.get('FBREF_BASE_URL', 'https://fbref.com')
+  FBREF_USER_AGENT = os.environ.get(
+    'FBREF_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+  )
+  FBREF_CONNECT_TIMEOUT = float(os.environ.get('FBREF_CONNECT_TIMEOUT', '3.05'))
+  FBREF_READ_TIMEOUT = float(os.environ.get('FBREF_READ_TIMEOUT', '15'))
+  FBREF_POOL_SIZE = int(os.environ.get('FBREF_POOL_SIZE', '8'))
+  FBREF_MAX_IN_FLIGHT = int(os.environ.get('FBREF_MAX_IN_FLIGHT', '8'))
+  FBREF_QUEUE_TIMEOUT = float(os.environ.get('FBREF_QUEUE_TIMEOUT', '10'))
+
+  # Shared by every worker on the host through a flock-guarded state file.
+  FBREF_RATE_LIMIT_PER_MINUTE = float(os.environ.get('FBREF_RATE_LIMIT_PER_MINUTE', '10'))
+  FBREF_RATE_LIMIT_BURST = int(os.environ.get('FBREF_RATE_LIMIT_BURST', '3'))
+  FBREF_RATE_LIMIT_MAX_WAIT = float(os.environ.get('FBREF_RATE_LIMIT_MAX_WAIT', '30'))
+  FBREF_RATE_LIMIT_FILE = os.environ.get(
+    'FBREF_RATE_LIMIT_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fbref_rate_limit.json')
+  )
+  FBREF_MAX_RETRIES = int(os.environ.get('FBREF_MAX_RETRIES', '3'))
+  FBREF_BACKOFF_BASE = float(os.environ.get('FBREF_BACKOFF_BASE', '1'))
+  FBREF_BACKOFF_MAX = float(os.environ.get('FBREF_BACKOFF_MAX', '30'))
+  FBREF_MAX_RETRY_AFTER = float(os.environ.get('FBREF_MAX_RETRY_AFTER', '120'))
+  # Like the rate limit, the breaker state is shared by every worker on the
+  # host through a flock-guarded file.
+  FBREF_BREAKER_FAILURES = int(os.environ.get('FBREF_BREAKER_FAILURES', '5'))
+  FBREF_BREAKER_RESET_SECONDS = float(os.environ.get('FBREF_BREAKER_RESET_SECONDS', '60'))
+  FBREF_BREAKER_FILE = os.environ.get(
+    'FBREF_BREAKER_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fbref_breaker.json')
+  )
+  FBREF_MAX_REDIRECTS = int(os.environ.get('FBREF_MAX_REDIRECTS', '5'))
+
+  BATCH_MAX_NAMES = int(os.environ.get('BATCH_MAX_NAMES', '200'))
+  BATCH_SCRAPE_WORKERS = int(os.environ.get('BATCH_SCRAPE_WORKERS', '4'))
+
+  SCRAPE_JOB_WORKERS = int(os.environ.get('SCRAPE_JOB_WORKERS', '4'))
+  SCRAPE_JOB_MAX_PENDING = int(os.environ.get('SCRAPE_JOB_MAX_PENDING', '100'))
+  SCRAPE_JOB_TIMEOUT_SECONDS = int(os.environ.get('SCRAPE_JOB_TIMEOUT_SECONDS', '300'))
+  SCRAPE_JOB_RETENTION_SECONDS = int(os.environ.get('SCRAPE_JOB_RETENTION_SECONDS', '3600'))
+  SCRAPE_JOB_RETRY_AFTER_SECONDS = int(os.environ.get('SCRAPE_JOB_RETRY_AFTER_SECONDS', '5'))
+  # An open event stream holds a worker thread for up to the stream timeout,
+  # so with the default gthread workers clients poll the job instead. Only
+  # enable it behind an async worker class (gevent, eventlet).
+  SCRAPE_JOB_EVENTS_ENABLED = os.environ.get('SCRAPE_JOB_EVENTS_ENABLED', 'false').lower() == 'true'
+  SCRAPE_JOB_STREAM_TIMEOUT_SECONDS = float(os.environ.get('SCRAPE_JOB_STREAM_TIMEOUT_SECONDS', '120'))
+  SCRAPE_JOB_POLL_SECONDS = float(os.environ.get('SCRAPE_JOB_POLL_SECONDS', '1'))
+  SCRAPE_JOB_KEEPALIVE_SECONDS = float(os.environ.get('SCRAPE_JOB_KEEPALIVE_SECONDS', '15'))
+
+  # Scoring weights for PlayerAnalyzer, re-read when the file changes.
+  ANALYZER_CONFIG_PATH = os.environ.get(
+    'ANALYZER_CONFIG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analyzer_config.json')
+  )
+  ANALYZER_RELOAD_SECONDS = float(os.environ.get('ANALYZER_RELOAD_SECONDS', '10'))
+  RESCORE_ENABLED = os.environ.get('RESCORE_ENABLED', 'true').lower() == 'true'
+  RESCORE_BATCH_SIZE = int(os.environ.get('RESCORE_BATCH_SIZE', '500'))
+  RESCORE_INTERVAL_SECONDS = float(os.environ.get('RESCORE_INTERVAL_SECONDS', '30'))
+  RESCORE_BATCH_PAUSE_SECONDS = float(os.environ.get('RESCORE_BATCH_PAUSE_SECONDS', '0.5'))
+
+  # Processes that parse and analyze fetched pages, per gunicorn worker. 0
+  # keeps parsing on the calling thread.
+  PARSE_POOL_WORKERS = int(os.environ.get('PARSE_POOL_WORKERS', '0'))
+  # Pages handed to the pool at once; 0 means twice the pool size.
+  PARSE_POOL_MAX_PENDING = int(os.environ.get('PARSE_POOL_MAX_PENDING', '0'))
+  PARSE_POOL_WAIT_SECONDS = float(os.environ.get('PARSE_POOL_WAIT_SECONDS', '30'))
+  PARSE_POOL_START_METHOD = os.environ.get('PARSE_POOL_START_METHOD', 'forkserver')
+
+  WARM_CONCURRENCY = int(os.environ.get('WARM_CONCURRENCY', '2'))
+  WARM_BATCH_SIZE = int(os.environ.get('WARM_BATCH_SIZE', '50'))
+  WARM_CHECKPOINT_DIR = os.environ.get(
+    'WARM_CHECKPOINT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'warm')
+  )
+
+  # "process" coalesces concurrent scrapes inside one worker; "postgres" also
+  # serializes them across workers with an advisory lock. The lock holder
+  # keeps one pooled connection for the whole scrape; waiters poll for the
+  # lock every SINGLE_FLIGHT_POLL_SECONDS and hold none in between.
+  SINGLE_FLIGHT_MODE = os.environ.get('SINGLE_FLIGHT_MODE', 'process')
+  SINGLE_FLIGHT_POLL_SECONDS = float(os.environ.get('SINGLE_FLIGHT_POLL_SECONDS', '0.25'))
+
+  INFO_TTL_SECONDS = int(os.environ.get('INFO_TTL_SECONDS', str(7 * 24 * 3600)))
+  STATS_TTL_SECONDS = int(os.environ.get('STATS_TTL_SECONDS', str(12 * 3600)))
+  REFRESH_ENABLED = os.environ.get('REFRESH_ENABLED', 'true').lower() == 'true'
+  REFRESH_MIN_INTERVAL_SECONDS = float(os.environ.get('REFRESH_MIN_INTERVAL_SECONDS', '6'))
+  REFRESH_QUEUE_SIZE = int(os.environ.get('REFRESH_QUEUE_SIZE', '500'))
+
+  COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+  GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+  BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+  COMPRESSION_CACHE_ENTRIES = int(os.environ.get('COMPRESSION_CACHE_ENTRIES', '1000'))
+
+  CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
+  CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', '86400'))
+
+  RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+  RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+  RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300'))
+  # Appended to on every player write and read by every worker on the host,
+  # so one worker's write drops the others' cached bodies.
+  RESPONSE_CACHE_INVALIDATION_FILE = os.environ.get(
+    'RESPONSE_CACHE_INVALIDATION_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'response_cache_invalidations.log')
+  )
+
+  SUGGEST_DEFAULT_LIMIT = int(os.environ.get('SUGGEST_DEFAULT_LIMIT', '8'))
+  SUGGEST_MAX_LIMIT = int(os.environ.get('SUGGEST_MAX_LIMIT', '25'))
+  SUGGEST_MAX_OFFSET = int(os.environ.get('SUGGEST_MAX_OFFSET', '100'))
+  SUGGEST_MIN_QUERY_LENGTH = int(os.environ.get('SUGGEST_MIN_QUERY_LENGTH', '2'))
+  # Only used without pg_trgm, where suggestions are prefix-only: ids of
+  # players with new aliases, so every worker's prefix trie picks them up.
+  SUGGEST_ALIAS_LOG_FILE = os.environ.get(
+    'SUGGEST_ALIAS_LOG_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'suggest_aliases.log')
+  )
+
+  LEADERBOARD_DEFAULT_LIMIT = int(os.environ.get('LEADERBOARD_DEFAULT_LIMIT', '20'))
+  LEADERBOARD_MAX_LIMIT = int(os.environ.get('LEADERBOARD_MAX_LIMIT', '100'))
+
+  SIMILARITY_INDEX_DIR = os.environ.get(
+    'SIMILARITY_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'similarity')
+  )
+  SIMILARITY_SAVE_INTERVAL_SECONDS = float(os.environ.get('SIMILARITY_SAVE_INTERVAL_SECONDS', '30'))
+  SIMILARITY_SYNC_INTERVAL_SECONDS = float(os.environ.get('SIMILARITY_SYNC_INTERVAL_SECONDS', '5'))
+  SIMILARITY_DEFAULT_K = int(os.environ.get('SIMILARITY_DEFAULT_K', '10'))
+  SIMILARITY_MAX_K = int(os.environ.get('SIMILARITY_MAX_K', '50'))
+
+  PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+  PAGE_CACHE_DIR = os.environ.get(
+    'PAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pages')
+  )
+  PAGE_CACHE_KEEP_VERSIONS = int(os.environ.get('PAGE_CACHE_KEEP_VERSIONS', '5'))
@@ -1,8 +1,66 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+
+from config import Config
 
 db = SQLAlchemy()
 
+def engine_options(uri):
+    options = {'pool_pre_ping': Config.DB_POOL_PRE_PING}
+    # SQLite (local runs) keeps its default pool, which takes no sizing.
+    if make_url(uri).get_backend_name() != 'sqlite':
+        options.update({
+            'pool_size': Config.DB_POOL_SIZE,
+            'max_overflow': Config.DB_MAX_OVERFLOW,
+            'pool_timeout': Config.DB_POOL_TIMEOUT,
+            'pool_recycle': Config.DB_POOL_RECYCLE
+        })
+    return options
+
 def init_db(app):
     db.init_app(app)
     with app.app_context():
-        db.create_all() 
\ No newline at end of file
+        if db.engine.dialect.name == 'postgresql':
+            with db.engine.begin() as connection:
+                connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        db.create_all()
+        upgrade_schema()
+        create_postgres_indexes()
+
+def upgrade_schema():
+    # create_all() only creates missing tables. Columns and indexes added to
+    # existing models later are nullable, so they can be added in place.
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        with db.engine.begin() as connection:
+            for column in missing:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
+def create_postgres_indexes():
+    if db.engine.dialect.name != 'postgresql':
+        return
+
+    with db.engine.begin() as connection:
+        # Serves the % similarity and LIKE 'prefix%' lookups behind /suggest.
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_player_aliases_alias_trgm '
+            'ON player_aliases USING gin (alias gin_trgm_ops)'
+        ))
+        # Stat changes are appended in capture order, so a BRIN index serves
+        # time-range scans over the whole history at a tiny fraction of a
+        # btree's size.
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_player_stat_changes_captured_at_brin '
+            'ON player_stat_changes USING brin (captured_at)'
+        ))
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# gunicorn -c gunicorn.conf.py app:app
+#
+# Threaded workers: requests spend most of their time waiting on Postgres,
+# and the in-process caches and indexes are shared by every thread of a
+# worker. Job event streams would each pin a thread, so they stay off
+# (SCRAPE_JOB_EVENTS_ENABLED) unless GUNICORN_WORKER_CLASS is async. The
+# app is loaded once in the master, so the schema is created once rather
+# than by every worker racing at boot; background threads only start on
+# first use, after the fork.
+
+# Each worker writes its Prometheus samples here and /metrics sums them. It
+# has to be set before the app (and prometheus_client) is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'fbref-metrics'))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Workers are replaced after a jittered number of requests so they do not
+# all restart together.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+preload_app = True
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to this one.
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def when_ready(server):
+    # Forked workers must not share the connections the master opened while
+    # creating the schema; each worker opens its own pool.
+    from app import app
+    from database import db
+
+    with app.app_context():
+        db.engine.dispose()
+
+def post_worker_init(worker):
+    # Background threads have to start in the worker; ones started in the
+    # preloaded master would not survive the fork.
+    from app import app
+    from services.rescorer import rescorer
+
+    rescorer.start(app)
+
+def worker_exit(server, worker):
+    # Write out similarity index changes still waiting on their debounce
+    # timer, and stop the worker's parse processes, before a recycled worker
+    # goes away.
+    from app import app
+    from services.parse_pool import parse_pool
+    from services.similarity_index import similarity_index
+
+    try:
+        with app.app_context():
+            similarity_index.flush()
+    except Exception as e:
+        server.log.error(f"Error flushing similarity index on worker exit: {str(e)}")
+    parse_pool.shutdown()
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,25 +1,155 @@
 from datetime import datetime
+from sqlalchemy import event, inspect
 from database import db
+from models.player_scouting_stat import PlayerScoutingStat
+from models.player_season_stat import PlayerSeasonStat
+from services.player_analyzer import analysis_input_hash, get_position_base
+
+RESPONSE_FIELDS = ('general_info', 'current_season_stats', 'scouting_report', 'player_overview')
+
+def stats_round_trip_errors(current_season_stats, scouting_report):
+  # Every scraped stat that typed rows built from it would render
+  # differently, as "<competition>.<column>" or "<stat>" with both texts.
+  errors = []
+  for competition, values in (current_season_stats or {}).items():
+    rendered = PlayerSeasonStat.from_scraped(0, competition, values).to_dict()
+    for column in sorted(rendered.keys() | values.keys()):
+      if rendered.get(column) != values.get(column):
+        errors.append(f"{competition}.{column}: {values.get(column)!r} -> {rendered.get(column)!r}")
+  for row in scouting_report or []:
+    rendered = PlayerScoutingStat.from_scraped(0, row).to_dict()
+    if rendered != row:
+      errors.append(f"{row.get('stat')}: {row!r} -> {rendered!r}")
+  return errors
 
 class Player(db.Model):
   __tablename__ = 'players'
+  __table_args__ = (
+    db.Index('ix_players_overall_rating_id', 'overall_rating', 'id'),
+    db.Index('ix_players_position_base_overall_rating_id', 'position_base', 'overall_rating', 'id'),
+  )
 
   id = db.Column(db.Integer, primary_key=True)
   name = db.Column(db.String(100), unique=True, nullable=False)
+  fbref_id = db.Column(db.String(16), unique=True, index=True)
+  fbref_url = db.Column(db.String(255))
   general_info = db.Column(db.JSON, nullable=False)
+  # Legacy JSON copies of the stats; rows written since the typed tables
+  # exist leave them empty, `flask players migrate-stats` moves the rest.
   current_season_stats = db.Column(db.JSON)
   scouting_report = db.Column(db.JSON)
   player_overview = db.Column(db.JSON)
   created_at = db.Column(db.DateTime, default=datetime.utcnow)
   updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+  info_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+  stats_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+  # Copies of general_info and player_overview fields the leaderboard filters
+  # and sorts on, kept in sync on every insert and update.
+  position_base = db.Column(db.String(2))
+  age = db.Column(db.SmallInteger, index=True)
+  club = db.Column(db.String(100), index=True)
+  national_team = db.Column(db.String(100), index=True)
+  overall_rating = db.Column(db.SmallInteger)
+  potential_rating = db.Column(db.SmallInteger, index=True)
+
+  # The analyzer config version player_overview was computed with, and a
+  # hash of the inputs it read; rows behind the current version are
+  # re-scored in the background (services/rescorer.py).
+  analysis_version = db.Column(db.String(12), index=True)
+  analysis_input_hash = db.Column(db.String(16))
+
+  # The encoded to_dict() body, written on first read and dropped whenever
+  # the row changes, so hits skip rebuilding and re-encoding the payload.
+  response_json = db.deferred(db.Column(db.LargeBinary))
+
+  season_stats = db.relationship(
+    'PlayerSeasonStat', order_by='PlayerSeasonStat.position', cascade='all, delete-orphan'
+  )
+  scouting_stats = db.relationship(
+    'PlayerScoutingStat', order_by='PlayerScoutingStat.position', cascade='all, delete-orphan'
+  )
+
+  def index_profile(self):
+    general_info = self.general_info or {}
+    overview = self.player_overview or {}
+    position = general_info.get('position')
+    age = general_info.get('age')
+
+    self.position_base = get_position_base(position) if isinstance(position, str) and position else None
+    self.age = age if isinstance(age, int) else None
+    self.club = (general_info.get('club') or None) and general_info['club'][:100]
+    self.national_team = (general_info.get('national_team') or None) and general_info['national_team'][:100]
+    self.overall_rating = overview.get('overall_rating')
+    self.potential_rating = (overview.get('potential') or {}).get('potential_rating')
+
+  def set_stats(self, current_season_stats, scouting_report):
+    self.season_stats = [
+      PlayerSeasonStat.from_scraped(position, competition, values)
+      for position, (competition, values) in enumerate((current_season_stats or {}).items())
+    ]
+    self.scouting_stats = [
+      PlayerScoutingStat.from_scraped(position, row)
+      for position, row in enumerate(scouting_report or [])
+    ]
+    self.current_season_stats = None
+    self.scouting_report = None
+    self.response_json = None
 
-  def to_dict(self):
+  def stats_round_trip_errors(self):
+    # Checks the legacy JSON a migration would convert, or, once the typed
+    # rows hold the stats, that storing their rendering again changes nothing.
+    if self.current_season_stats is not None or self.scouting_report is not None:
+      return stats_round_trip_errors(self.current_season_stats, self.scouting_report)
+    return stats_round_trip_errors(self.season_stats_dict(), self.scouting_report_list())
+
+  def analysis_inputs_hash(self):
+    return analysis_input_hash(self.general_info, self.scouting_report_list())
+
+  def mark_analyzed(self, version):
+    self.analysis_version = version
+    self.analysis_input_hash = self.analysis_inputs_hash()
+
+  def merge_season_stats(self, competition, values):
+    # Upserts one competition's season stats from a stats table row. Returns
+    # True if the row changed.
+    if self.current_season_stats is not None and not self.season_stats:
+      self.set_stats(self.current_season_stats, self.scouting_report)
+
+    for row in self.season_stats:
+      if row.competition == competition:
+        return row.merge_scraped(values)
+    self.season_stats.append(PlayerSeasonStat.from_scraped(len(self.season_stats), competition, values))
+    return True
+
+  def season_stats_dict(self):
+    if self.current_season_stats is not None and not self.season_stats:
+      return self.current_season_stats
+    return {row.competition: row.to_dict() for row in self.season_stats}
+
+  def scouting_report_list(self):
+    if self.scouting_report is not None and not self.scouting_stats:
+      return self.scouting_report
+    return [row.to_dict() for row in self.scouting_stats]
+
+  def to_dict(self, fields=None):
+    sections = {
+      'general_info': lambda: self.general_info,
+      'current_season_stats': self.season_stats_dict,
+      'scouting_report': self.scouting_report_list,
+      'player_overview': lambda: self.player_overview
+    }
     return {
       'success': True,
-      'data': {
-          'general_info': self.general_info,
-          'current_season_stats': self.current_season_stats,
-          'scouting_report': self.scouting_report,
-        'player_overview': self.player_overview
-      }
-    } 
\ No newline at end of file
+      'data': {field: build() for field, build in sections.items() if fields is None or field in fields}
+    }
+
+@event.listens_for(Player, 'before_insert')
+@event.listens_for(Player, 'before_update')
+def index_player_profile(mapper, connection, player):
+  player.index_profile()
+
+@event.listens_for(Player, 'before_update')
+def drop_stale_response(mapper, connection, player):
+  if not inspect(player).attrs.response_json.history.has_changes():
+    player.response_json = None
@@ -0,0 +1,11 @@
+from datetime import datetime
+from database import db
+
+class PlayerAlias(db.Model):
+  __tablename__ = 'player_aliases'
+
+  alias = db.Column(db.String(200), primary_key=True)
+  player_id = db.Column(db.Integer, db.ForeignKey('players.id', ondelete='CASCADE'), nullable=False, index=True)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+  player = db.relationship('Player', lazy='joined')
@@ -0,0 +1,40 @@
+from database import db
+from services.stat_values import format_float, is_percent, parse_float, source_text
+
+class PlayerScoutingStat(db.Model):
+  __tablename__ = 'player_scouting_stats'
+  __table_args__ = (
+    db.Index('ix_player_scouting_stats_stat_percentile', 'stat', 'percentile', 'player_id'),
+    db.Index('ix_player_scouting_stats_stat_per_90', 'stat', 'per_90', 'player_id'),
+  )
+
+  player_id = db.Column(db.Integer, db.ForeignKey('players.id', ondelete='CASCADE'), primary_key=True)
+  position = db.Column(db.SmallInteger, primary_key=True)
+  stat = db.Column(db.String(100), nullable=False)
+  per_90 = db.Column(db.Float)
+  per_90_percent = db.Column(db.Boolean, nullable=False, default=False)
+  percentile = db.Column(db.SmallInteger, nullable=False)
+  per_90_text = db.Column(db.String(32))
+
+  @classmethod
+  def from_scraped(cls, position, row):
+    stat = cls(
+      position=position,
+      stat=row['stat'],
+      per_90=parse_float(row.get('per_90')),
+      per_90_percent=is_percent(row.get('per_90')),
+      percentile=row['percentile']
+    )
+    stat.per_90_text = source_text(row.get('per_90'), stat.format_per_90())
+    return stat
+
+  def format_per_90(self):
+    # fbref shows rates with two decimals and shares as "83.4%".
+    return format_float(self.per_90, 1 if self.per_90_percent else 2, self.per_90_percent)
+
+  def to_dict(self):
+    return {
+      'stat': self.stat,
+      'per_90': self.per_90_text if self.per_90_text is not None else self.format_per_90(),
+      'percentile': self.percentile
+    }
@@ -0,0 +1,82 @@
+from database import db
+from services.stat_values import format_float, format_int, parse_float, parse_int, source_text
+
+# Column order matches the stats pullout on fbref and the response shape.
+SEASON_STAT_COLUMNS = (
+  ('matches', 'int'),
+  ('minutes', 'int'),
+  ('goals', 'int'),
+  ('assists', 'int'),
+  ('expected_goals', 'float'),
+  ('non_penalty_xg', 'float'),
+  ('expected_assists', 'float'),
+  ('shot_creating_actions', 'int'),
+  ('goal_creating_actions', 'int')
+)
+
+def parse_season_values(values, only_present=False):
+  return {
+    column: parse_int(values.get(column)) if kind == 'int' else parse_float(values.get(column))
+    for column, kind in SEASON_STAT_COLUMNS
+    if not only_present or column in values
+  }
+
+class PlayerSeasonStat(db.Model):
+  __tablename__ = 'player_season_stats'
+
+  player_id = db.Column(db.Integer, db.ForeignKey('players.id', ondelete='CASCADE'), primary_key=True)
+  competition = db.Column(db.String(100), primary_key=True, index=True)
+  position = db.Column(db.SmallInteger, nullable=False)
+  matches = db.Column(db.Integer)
+  minutes = db.Column(db.Integer)
+  goals = db.Column(db.Integer)
+  assists = db.Column(db.Integer)
+  expected_goals = db.Column(db.Float)
+  non_penalty_xg = db.Column(db.Float)
+  expected_assists = db.Column(db.Float)
+  shot_creating_actions = db.Column(db.Integer)
+  goal_creating_actions = db.Column(db.Integer)
+  # Scraped text of the columns whose rendered value would differ from it.
+  source_text = db.Column(db.JSON)
+
+  @classmethod
+  def from_scraped(cls, position, competition, values):
+    row = cls(position=position, competition=competition, **parse_season_values(values))
+    row.source_text = row._source_text(values) or None
+    return row
+
+  def merge_scraped(self, values):
+    # Only the columns present in values are written, so a table that lacks
+    # some of them keeps what the player page gave us. True if any changed.
+    changed = False
+    for column, value in parse_season_values(values, only_present=True).items():
+      if getattr(self, column) != value:
+        setattr(self, column, value)
+        changed = True
+
+    texts = {column: text for column, text in (self.source_text or {}).items() if column not in values}
+    texts.update(self._source_text(values))
+    if texts != (self.source_text or {}):
+      self.source_text = texts or None
+      changed = True
+    return changed
+
+  def format(self, column, kind):
+    value = getattr(self, column)
+    return format_int(value) if kind == 'int' else format_float(value, 1)
+
+  def to_dict(self):
+    texts = self.source_text or {}
+    return {
+      column: texts[column] if column in texts else self.format(column, kind)
+      for column, kind in SEASON_STAT_COLUMNS
+    }
+
+  def _source_text(self, values):
+    texts = {}
+    for column, kind in SEASON_STAT_COLUMNS:
+      if column in values:
+        text = source_text(values[column], self.format(column, kind))
+        if text is not None:
+          texts[column] = text
+    return texts
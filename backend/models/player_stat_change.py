@@ -0,0 +1,19 @@
+from database import db
+
+class PlayerStatChange(db.Model):
+  # Append-only stat history. A row is written only when a stat's value
+  # differs from the last one recorded for the player (None once the stat
+  # is gone), so a player's stats at any time are the latest row per stat
+  # captured before it. Postgres also gets a BRIN index on captured_at
+  # (database.create_postgres_indexes) for time-range scans.
+  __tablename__ = 'player_stat_changes'
+  __table_args__ = (
+    db.Index('ix_player_stat_changes_series', 'player_id', 'stat', 'captured_at'),
+  )
+
+  id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+  player_id = db.Column(db.Integer, db.ForeignKey('players.id', ondelete='CASCADE'), nullable=False)
+  captured_at = db.Column(db.DateTime, nullable=False)
+  stat = db.Column(db.String(160), nullable=False)
+  value = db.Column(db.Float)
+
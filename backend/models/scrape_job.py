@@ -0,0 +1,34 @@
+from datetime import datetime
+from database import db
+
+class ScrapeJob(db.Model):
+  __tablename__ = 'scrape_jobs'
+  __table_args__ = (
+    db.Index('ix_scrape_jobs_name_key_status', 'name_key', 'status'),
+  )
+
+  id = db.Column(db.String(32), primary_key=True)
+  name = db.Column(db.String(200), nullable=False)
+  name_key = db.Column(db.String(200), nullable=False)
+  # queued -> running -> done | failed
+  status = db.Column(db.String(16), nullable=False, default='queued')
+  result = db.Column(db.JSON)
+  error = db.Column(db.Text)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+  started_at = db.Column(db.DateTime)
+  finished_at = db.Column(db.DateTime)
+
+  @property
+  def finished(self):
+    return self.status in ('done', 'failed')
+
+  def to_dict(self):
+    return {
+      'id': self.id,
+      'name': self.name,
+      'status': self.status,
+      'result': self.result,
+      'error': self.error,
+      'created_at': self.created_at.isoformat() if self.created_at else None,
+      'finished_at': self.finished_at.isoformat() if self.finished_at else None
+    }
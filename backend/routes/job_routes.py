@@ -0,0 +1,68 @@
+import time
+
+from flask import Blueprint, Response, json, jsonify, stream_with_context
+from config import Config
+from database import db
+from services.scrape_jobs import scrape_jobs
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>')
+def get_job(job_id):
+  try:
+    job = scrape_jobs.get(job_id)
+    if job is None:
+      return jsonify({"success": False, "error": "Job not found"}), 404
+
+    response = jsonify({"success": True, "data": job.to_dict()})
+    response.cache_control.no_store = True
+    if not job.finished:
+      response.headers['Retry-After'] = str(max(1, round(Config.SCRAPE_JOB_POLL_SECONDS)))
+    return response
+
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+@jobs_bp.route('/<job_id>/events')
+def job_events(job_id):
+  if not Config.SCRAPE_JOB_EVENTS_ENABLED:
+    return jsonify({"success": False, "error": "Job event streams are disabled, poll the job instead"}), 404
+  if scrape_jobs.get(job_id) is None:
+    return jsonify({"success": False, "error": "Job not found"}), 404
+
+  def events():
+    deadline = time.monotonic() + Config.SCRAPE_JOB_STREAM_TIMEOUT_SECONDS
+    last_status = None
+    last_sent = time.monotonic()
+    while True:
+      job = scrape_jobs.get(job_id)
+      payload = job.to_dict() if job is not None else None
+      # Hand the connection back between checks; a stream can stay open
+      # far longer than a normal request.
+      db.session.close()
+
+      if payload is None:
+        # Deleted by retention while the stream was open.
+        yield f"event: gone\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+        return
+
+      if payload['status'] != last_status:
+        last_status = payload['status']
+        last_sent = time.monotonic()
+        yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+      elif time.monotonic() - last_sent >= Config.SCRAPE_JOB_KEEPALIVE_SECONDS:
+        last_sent = time.monotonic()
+        yield ": keep-alive\n\n"
+
+      if payload['status'] in ('done', 'failed'):
+        return
+      if time.monotonic() >= deadline:
+        yield "event: timeout\ndata: {}\n\n"
+        return
+      scrape_jobs.wait(job_id, Config.SCRAPE_JOB_POLL_SECONDS)
+
+  return Response(
+    stream_with_context(events()),
+    mimetype='text/event-stream',
+    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+  )
@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+from services.metrics import render
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics')
+def metrics():
+  body, content_type = render()
+  response = Response(body, content_type=content_type)
+  response.cache_control.no_store = True
+  return response
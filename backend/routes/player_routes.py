@@ -1,10 +1,19 @@
-from flask import Blueprint, request, jsonify
-from services.player_scraper import PlayerScraper
-from models.player import Player
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify, url_for
+from config import Config
 from database import db
+from models.player import Player
+from services.http_cache import json_response
+from services.player_service import PlayerService
+from services.player_suggester import player_suggester
+from services.response_cache import response_cache
+from services.scrape_jobs import JobQueueFull
+from services.similarity_index import similarity_index
+from services.stat_history import stat_history
 
 player_bp = Blueprint('player', __name__)
-player_scraper = PlayerScraper()
+player_service = PlayerService()
 
 @player_bp.route('/search')
 def search_player():
@@ -13,24 +22,156 @@ def search_player():
     if not name:
       return jsonify({"success": False, "error": "No name provided"}), 400
 
-    player = Player.query.filter_by(name=name).first()
-    if player:
-      return jsonify(player.to_dict())
-
-    result = player_scraper.search_player(name)
-        
-    if result['success']:
-      new_player = Player(
-        name=name,
-        general_info=result['data']['general_info'],
-        current_season_stats=result['data'].get('current_season_stats'),
-        scouting_report=result['data'].get('scouting_report'),
-        player_overview=result['data'].get('player_overview')
+    try:
+      fields = player_service.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+      return jsonify({"success": False, "error": str(e)}), 400
+
+    cached = player_service.cached_response(name, fields)
+    if cached is not None:
+      return json_response(*cached)
+
+    job_id = player_service.submit_scrape(name)
+    data = {"job_id": job_id, "status_url": url_for('jobs.get_job', job_id=job_id)}
+    if Config.SCRAPE_JOB_EVENTS_ENABLED:
+      data["events_url"] = url_for('jobs.job_events', job_id=job_id)
+    response = jsonify({"success": True, "data": data})
+    response.status_code = 202
+    response.cache_control.no_store = True
+    response.headers['Location'] = url_for('jobs.get_job', job_id=job_id)
+    return response
+
+  except JobQueueFull as e:
+    response = jsonify({"success": False, "error": str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(Config.SCRAPE_JOB_RETRY_AFTER_SECONDS)
+    return response
+
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+@player_bp.route('/batch', methods=['POST'])
+def batch_search_players():
+  try:
+    payload = request.get_json(silent=True) or {}
+    names = payload.get('names')
+
+    if not isinstance(names, list) or not names:
+      return jsonify({"success": False, "error": "Expected a non-empty list of names"}), 400
+    if not all(isinstance(name, str) and name.strip() for name in names):
+      return jsonify({"success": False, "error": "Every name must be a non-empty string"}), 400
+    if len(names) > Config.BATCH_MAX_NAMES:
+      return jsonify({"success": False, "error": f"At most {Config.BATCH_MAX_NAMES} names per batch"}), 400
+
+    return jsonify({"success": True, "results": player_service.search_many(names)})
+
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+@player_bp.route('/cache/stats')
+def cache_stats():
+  return jsonify({"success": True, "data": response_cache.stats()})
+
+@player_bp.route('/upstream')
+def upstream_stats():
+  return jsonify({"success": True, "data": player_service.upstream_stats()})
+
+
+@player_bp.route('/suggest')
+def suggest_players():
+  try:
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', Config.SUGGEST_DEFAULT_LIMIT, type=int)
+    page = max(1, request.args.get('page', 1, type=int))
+    limit = max(1, min(limit, Config.SUGGEST_MAX_LIMIT))
+
+    suggestions, has_more = player_suggester.suggest(query, limit, (page - 1) * limit)
+
+    return jsonify({
+      "success": True,
+      "data": {
+        "query": query,
+        "page": page,
+        "limit": limit,
+        "has_more": has_more,
+        "results": suggestions
+      }
+    })
+
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+@player_bp.route('/<int:player_id>/similar')
+def similar_players(player_id):
+  try:
+    k = request.args.get('k', Config.SIMILARITY_DEFAULT_K, type=int)
+    same_position = request.args.get('same_position', 'false').lower() in ('1', 'true', 'yes')
+
+    matches = similarity_index.similar(player_id, k, same_position)
+    if matches is None:
+      if db.session.get(Player, player_id) is None:
+        return jsonify({"success": False, "error": "Player not found"}), 404
+      return jsonify({"success": False, "error": "Player has no scouting report to compare"}), 404
+
+    players = {
+      player.id: player
+      for player in Player.query.filter(Player.id.in_([match_id for match_id, _ in matches])).all()
+    } if matches else {}
+
+    results = []
+    for match_id, similarity in matches:
+      player = players.get(match_id)
+      if player is None:
+        continue
+      general_info = player.general_info or {}
+      results.append({
+        "id": player.id,
+        "name": general_info.get('name') or player.name,
+        "position": general_info.get('position'),
+        "club": general_info.get('club'),
+        "photo_url": general_info.get('photo_url'),
+        "similarity": similarity
+      })
+
+    return jsonify({
+      "success": True,
+      "data": {
+        "player_id": player_id,
+        "same_position": same_position,
+        "results": results
+      }
+    })
+
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+@player_bp.route('/<int:player_id>/history')
+def player_history(player_id):
+  try:
+    try:
+      since, until = (
+        datetime.fromisoformat(request.args[key]) if request.args.get(key) else None
+        for key in ('since', 'until')
       )
-      db.session.add(new_player)
-      db.session.commit()
+    except ValueError:
+      return jsonify({"success": False, "error": "since and until must be ISO 8601 timestamps"}), 400
+
+    if db.session.query(Player.id).filter(Player.id == player_id).first() is None:
+      return jsonify({"success": False, "error": "Player not found"}), 404
+
+    # Without ?stat= the response lists the stats that have a history.
+    stat = request.args.get('stat')
+    if not stat:
+      return jsonify({"success": True, "data": {"player_id": player_id, "stats": stat_history.stats(player_id)}})
+
+    return jsonify({
+      "success": True,
+      "data": {
+        "player_id": player_id,
+        "stat": stat,
+        "points": stat_history.series(player_id, stat, since, until)
+      }
+    })
 
-    return jsonify(result)
-        
   except Exception as e:
-    return jsonify({"success": False, "error": str(e)}), 500
\ No newline at end of file
+    return jsonify({"success": False, "error": str(e)}), 500
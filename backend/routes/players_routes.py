@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from services.player_leaderboard import player_leaderboard
+
+players_bp = Blueprint('players', __name__)
+
+@players_bp.route('/leaderboard')
+def leaderboard():
+  try:
+    sort = request.args.get('sort', 'overall_rating')
+    order = request.args.get('order', 'desc')
+    results, next_cursor = player_leaderboard.top(
+      sort=sort,
+      metric=request.args.get('metric', 'percentile'),
+      order=order,
+      position=request.args.get('position'),
+      min_age=request.args.get('min_age', type=int),
+      max_age=request.args.get('max_age', type=int),
+      club=request.args.get('club'),
+      national_team=request.args.get('national_team'),
+      competition=request.args.get('competition'),
+      limit=request.args.get('limit', type=int),
+      cursor=request.args.get('cursor')
+    )
+
+    return jsonify({
+      "success": True,
+      "data": {
+        "sort": sort,
+        "order": order,
+        "next_cursor": next_cursor,
+        "results": results
+      }
+    })
+
+  except ValueError as e:
+    return jsonify({"success": False, "error": str(e)}), 400
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,75 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from services.rate_limiter import LockedState
+
+class CircuitBreaker:
+    # With a path, the state lives in a flock-guarded file like the rate
+    # limiter's, so every worker on the host opens and closes together
+    # instead of each one spending its own failures on a struggling upstream.
+    def __init__(self, failure_threshold, reset_timeout, path=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._memory = {}
+
+    def allow(self):
+        with self._state() as state:
+            if state.get('state') == 'open' and time.time() >= state.get('opened_until', 0.0):
+                # Let traffic probe the upstream again; the first failure
+                # re-opens the breaker, the first success closes it.
+                state['state'] = 'half_open'
+            return state.get('state') != 'open'
+
+    def record_success(self):
+        with self._state() as state:
+            if state.get('failures') or state.get('state', 'closed') != 'closed':
+                state['failures'] = 0
+                state['state'] = 'closed'
+
+    def record_failure(self, open_for=None):
+        with self._state() as state:
+            state['failures'] = state.get('failures', 0) + 1
+            if (open_for is not None or state.get('state') == 'half_open'
+                    or state['failures'] >= self.failure_threshold):
+                state['state'] = 'open'
+                state['opened_until'] = time.time() + max(open_for or 0, self.reset_timeout)
+
+    def seconds_until_retry(self):
+        with self._state() as state:
+            return self._seconds_until_retry(state)
+
+    def state(self):
+        with self._state() as state:
+            return self._current(state)
+
+    def stats(self):
+        with self._state() as state:
+            return {
+                'state': self._current(state),
+                'consecutive_failures': state.get('failures', 0),
+                'retry_in_seconds': round(self._seconds_until_retry(state), 1)
+            }
+
+    def _current(self, state):
+        current = state.get('state', 'closed')
+        if current == 'open' and time.time() >= state.get('opened_until', 0.0):
+            return 'half_open'
+        return current
+
+    def _seconds_until_retry(self, state):
+        if state.get('state') != 'open':
+            return 0
+        return max(0.0, state.get('opened_until', 0.0) - time.time())
+
+    @contextmanager
+    def _state(self):
+        if self.path is None:
+            with self._lock:
+                yield self._memory
+        else:
+            with LockedState(self.path) as state:
+                yield state
@@ -0,0 +1,125 @@
+import re
+from urllib.parse import urlparse
+
+from lxml import etree
+
+from services.fbref_client import FbrefClient
+
+# fbref competition ids, URL slugs and the label player pages use for the
+# competition in their season stats, for the leagues we seed from.
+COMPETITIONS = {
+    'Premier League': (9, 'Premier-League', 'Premier League'),
+    'La Liga': (12, 'La-Liga', 'La Liga'),
+    'Serie A': (11, 'Serie-A', 'Serie A'),
+    'Bundesliga': (20, 'Bundesliga', 'Bundesliga'),
+    'Ligue 1': (13, 'Ligue-1', 'Ligue 1'),
+    'Eredivisie': (23, 'Eredivisie', 'Eredivisie'),
+    'Primeira Liga': (32, 'Primeira-Liga', 'Primeira Liga'),
+    'Major League Soccer': (22, 'Major-League-Soccer', 'MLS'),
+    'Champions League': (8, 'Champions-League', 'Champions Lg')
+}
+
+# Stats table columns that fill the season stats of a player page. They are
+# spread over several tables (standard, goal and shot creation, ...).
+SEASON_STAT_CELLS = {
+    'games': 'matches',
+    'minutes': 'minutes',
+    'goals': 'goals',
+    'assists': 'assists',
+    'xg': 'expected_goals',
+    'npxg': 'non_penalty_xg',
+    'xg_assists': 'expected_assists',
+    'sca': 'shot_creating_actions',
+    'gca': 'goal_creating_actions'
+}
+
+COMMENTS = re.compile(rb'<!--(.*?)-->', re.S)
+PLAYER_URL = re.compile(r'/players/([0-9a-f]{8})/')
+SQUAD_URL = re.compile(r'/squads/([0-9a-f]{8})/')
+
+def find_competition(name):
+    for known, competition in COMPETITIONS.items():
+        if known.lower() == name.strip().lower():
+            return competition
+    raise ValueError(f"Unknown competition {name!r}, expected one of: {', '.join(COMPETITIONS)}")
+
+class StatsTableScraper:
+    def __init__(self, client=None):
+        self.client = client or FbrefClient()
+
+    def label(self, name):
+        return find_competition(name)[2]
+
+    def parse_players(self, html, table_suffix=None):
+        # One entry per player listed in the page's stats tables, with the
+        # season stats found across all of them. fbref ships most tables
+        # inside HTML comments and unhides them with JavaScript, so the
+        # comments are parsed as well as the page.
+        fragments = [html] + [
+            match.group(1) for match in COMMENTS.finditer(html) if b'data-stat="player"' in match.group(1)
+        ]
+
+        parser = etree.HTMLParser(encoding='utf-8')
+        players = {}
+        for fragment in fragments:
+            tree = etree.fromstring(fragment, parser)
+            if tree is None:
+                continue
+            for table in tree.xpath('//table[starts-with(@id, "stats_")]'):
+                if table_suffix and not table.get('id').endswith(table_suffix):
+                    continue
+                for row in table.xpath('./tbody/tr[not(contains(@class, "thead"))]'):
+                    self._parse_row(row, players)
+        return list(players.values())
+
+    def _parse_row(self, row, players):
+        # Squad pages put the player in a row header, competition pages in a cell.
+        link = next(iter(row.xpath('./*[@data-stat="player"]/a[@href]')), None)
+        if link is None:
+            return
+        match = PLAYER_URL.search(link.get('href'))
+        name = ''.join(link.itertext()).strip()
+        if not match or not name:
+            return
+
+        player = players.setdefault(match.group(1), {
+            'fbref_id': match.group(1),
+            'name': name,
+            'url': self.client.url_for(link.get('href')),
+            'season_stats': {}
+        })
+        for cell in row.xpath('./td[@data-stat]'):
+            column = SEASON_STAT_CELLS.get(cell.get('data-stat'))
+            text = ''.join(cell.itertext()).strip()
+            if column and text:
+                player['season_stats'].setdefault(column, text)
+
+class CompetitionScraper(StatsTableScraper):
+    def competition(self, name):
+        return find_competition(name)
+
+    def stats_path(self, name):
+        competition_id, slug, _ = self.competition(name)
+        return f"/en/comps/{competition_id}/stats/{slug}-Stats"
+
+    def players(self, name):
+        response = self.client.get(self.stats_path(name))
+        if response.status_code != 200:
+            raise ValueError(f"Could not load {name} player stats (HTTP {response.status_code})")
+        return self.parse_players(response.content)
+
+class SquadScraper(StatsTableScraper):
+    # A squad page has every stats table for each competition the team
+    # played, suffixed with the competition id ("stats_standard_12").
+    def squad_path(self, squad):
+        # Only the path is kept, so the client's base URL decides the host.
+        path = urlparse(squad.strip()).path
+        if SQUAD_URL.search(path):
+            return path
+        raise ValueError(f"Not an fbref squad URL: {squad!r}")
+
+    def players(self, squad, competition):
+        response = self.client.get(self.squad_path(squad))
+        if response.status_code != 200:
+            raise ValueError(f"Could not load squad page {squad} (HTTP {response.status_code})")
+        return self.parse_players(response.content, f"_{find_competition(competition)[0]}")
@@ -0,0 +1,40 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(obj, default=None):
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONProvider(DefaultJSONProvider):
+    # jsonify() and flask.json through orjson when it is installed. Calls
+    # with stdlib-only options (indent, cls, ...) and installs without
+    # orjson keep the default encoder.
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(
+            dumps(self._prepare_response_obj(args, kwargs), self.default),
+            mimetype=self.mimetype
+        )
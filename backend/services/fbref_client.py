@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from services.circuit_breaker import CircuitBreaker
+from services.metrics import fbref_responses
+from services.rate_limiter import FileTokenBucket, RateLimitTimeout
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class UpstreamBusyError(Exception):
+    pass
+
+class UpstreamUnavailableError(Exception):
+    pass
+
+class FbrefClient:
+    def __init__(self, base_url=None, pool_size=None, max_in_flight=None,
+                 connect_timeout=None, read_timeout=None, queue_timeout=None,
+                 rate_limiter=None, breaker=None, max_retries=None):
+        self.base_url = (base_url or Config.FBREF_BASE_URL).rstrip('/')
+        self.pool_size = pool_size or Config.FBREF_POOL_SIZE
+        self.max_in_flight = max_in_flight or Config.FBREF_MAX_IN_FLIGHT
+        self.timeout = (
+            connect_timeout or Config.FBREF_CONNECT_TIMEOUT,
+            read_timeout or Config.FBREF_READ_TIMEOUT
+        )
+        self.queue_timeout = queue_timeout if queue_timeout is not None else Config.FBREF_QUEUE_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else Config.FBREF_MAX_RETRIES
+        self.rate_limiter = rate_limiter or FileTokenBucket(
+            Config.FBREF_RATE_LIMIT_FILE,
+            Config.FBREF_RATE_LIMIT_PER_MINUTE / 60,
+            Config.FBREF_RATE_LIMIT_BURST,
+            Config.FBREF_RATE_LIMIT_MAX_WAIT
+        )
+        self.breaker = breaker or CircuitBreaker(
+            Config.FBREF_BREAKER_FAILURES,
+            Config.FBREF_BREAKER_RESET_SECONDS,
+            Config.FBREF_BREAKER_FILE
+        )
+
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._counter_lock = threading.Lock()
+        self._waiting_for_slot = 0
+        self._in_flight = 0
+        self.session = self._build_session()
+
+    def _build_session(self):
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': Config.FBREF_USER_AGENT,
+            'Connection': 'keep-alive'
+        })
+
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.pool_size,
+            pool_block=True,
+            max_retries=0
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def url_for(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}{path}"
+
+    def get(self, path, headers=None):
+        # 429s, 5xx responses and connection errors are retried with jittered
+        # exponential backoff. Once retries run out the breaker counts a
+        # failure, and while it is open requests fail fast instead of adding
+        # load to an upstream that is already struggling.
+        if not self.breaker.allow():
+            raise UpstreamUnavailableError(
+                f'fbref is unavailable, retrying in {self.breaker.seconds_until_retry():.0f}s'
+            )
+
+        url = self.url_for(path)
+        for attempt in range(self.max_retries + 1):
+            error = None
+            try:
+                response = self._send(url, headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            fbref_responses.labels(str(response.status_code) if response is not None else 'error').inc()
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+
+            retry_after = self._retry_after(response)
+            if retry_after is not None:
+                self.rate_limiter.pause(retry_after)
+            if attempt == self.max_retries or (retry_after or 0) > Config.FBREF_MAX_RETRY_AFTER:
+                break
+
+            backoff = min(Config.FBREF_BACKOFF_MAX, Config.FBREF_BACKOFF_BASE * 2 ** attempt)
+            time.sleep(max(retry_after or 0, random.uniform(0, backoff)))
+
+        self.breaker.record_failure(open_for=retry_after)
+        if error is not None:
+            raise error
+        return response
+
+    def _send(self, url, headers):
+        # Redirects are followed here rather than by requests, so that every
+        # hop (a search that lands on a player page is two) takes its own
+        # rate-limit token.
+        for _ in range(Config.FBREF_MAX_REDIRECTS + 1):
+            response = self._send_once(url, headers)
+            if not response.is_redirect:
+                return response
+            url = urljoin(response.url, response.headers['Location'])
+            response.close()
+        raise requests.TooManyRedirects(f'More than {Config.FBREF_MAX_REDIRECTS} redirects from fbref')
+
+    def _send_once(self, url, headers):
+        try:
+            self.rate_limiter.acquire()
+        except RateLimitTimeout as e:
+            raise UpstreamBusyError(str(e))
+
+        with self._counter_lock:
+            self._waiting_for_slot += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._counter_lock:
+                self._waiting_for_slot -= 1
+        if not acquired:
+            raise UpstreamBusyError('Too many requests in flight to fbref, try again later')
+
+        with self._counter_lock:
+            self._in_flight += 1
+        try:
+            return self.session.get(url, headers=headers, timeout=self.timeout, allow_redirects=False)
+        finally:
+            with self._counter_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _retry_after(self, response):
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self):
+        with self._counter_lock:
+            waiting_for_slot = self._waiting_for_slot
+            in_flight = self._in_flight
+        rate_limit = self.rate_limiter.stats()
+        return {
+            'breaker': self.breaker.stats(),
+            'rate_limit': rate_limit,
+            'queue_depth': rate_limit['waiting'] + waiting_for_slot,
+            'in_flight': in_flight
+        }
+
+    def search(self, name):
+        return self.get(f"/search/search.fcgi?search={quote(name)}")
+
+    def close(self):
+        self.session.close()
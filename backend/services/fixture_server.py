@@ -0,0 +1,128 @@
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Serves saved fbref pages so the scraper runs without the network, for
+# `flask players warm/ingest --fixtures` and benchmarks/fbref_standin.py.
+# Fixtures are named "<fbref id>-<Name-Slug>.html"; a search for the player's
+# name redirects to /en/players/<fbref id>/<Name-Slug> like fbref does.
+# "comp-<competition id>-<Name-Slug>.html" is served as that competition's
+# player stats page, /en/comps/<competition id>/stats/<Name-Slug>-Stats, and
+# "squad-<squad id>-<Name-Slug>.html" as that squad's stats page,
+# /en/squads/<squad id>/<Name-Slug>-Stats.
+
+def slugify(name):
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def load_fixtures(fixtures_dir):
+    pages = {}
+    for filename in sorted(os.listdir(fixtures_dir)):
+        match = re.match(r'^([0-9a-f]{8})-(.+)\.html$', filename)
+        if match:
+            pages[match.group(1)] = (match.group(2), os.path.join(fixtures_dir, filename))
+    return pages
+
+def load_competitions(fixtures_dir):
+    competitions = {}
+    for filename in sorted(os.listdir(fixtures_dir)):
+        match = re.match(r'^comp-(\d+)-(.+)\.html$', filename)
+        if match:
+            competitions[match.group(1)] = os.path.join(fixtures_dir, filename)
+    return competitions
+
+def load_squads(fixtures_dir):
+    squads = {}
+    for filename in sorted(os.listdir(fixtures_dir)):
+        match = re.match(r'^squad-([0-9a-f]{8})-(.+)\.html$', filename)
+        if match:
+            squads[match.group(1)] = os.path.join(fixtures_dir, filename)
+    return squads
+
+def make_handler(pages, delay, conditional=True, competitions=None, squads=None, aliases=False):
+    competitions = competitions or {}
+    squads = squads or {}
+    by_slug = {slugify(slug): player_id for player_id, (slug, _) in pages.items()}
+
+    def find_player(query):
+        query = slugify(query)
+        if query in by_slug:
+            return by_slug[query]
+        if aliases:
+            # "<player name> <anything>" lands on that player, so a load test
+            # can keep searching names the app has not stored yet.
+            matches = [slug for slug in by_slug if query.startswith(f'{slug}-')]
+            if matches:
+                return by_slug[max(matches, key=len)]
+        return None
+
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)
+
+            url = urlparse(self.path)
+
+            if url.path == '/search/search.fcgi':
+                query = parse_qs(url.query).get('search', [''])[0]
+                player_id = find_player(query)
+                if player_id:
+                    slug = pages[player_id][0]
+                    return self._send(302, headers={'Location': f"/en/players/{player_id}/{slug}"})
+                return self._send(200, b'<html><body><div id="searches">No results</div></body></html>',
+                                  {'Content-Type': 'text/html; charset=utf-8'})
+
+            match = re.match(r'^/en/players/([0-9a-f]{8})/', url.path)
+            if match and match.group(1) in pages:
+                path = pages[match.group(1)][1]
+                with open(path, 'rb') as f:
+                    body = f.read()
+                headers = {'Content-Type': 'text/html; charset=utf-8'}
+                if conditional:
+                    # Editing a fixture changes both validators, like a real
+                    # page update would.
+                    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                    last_modified = formatdate(int(os.path.getmtime(path)), usegmt=True)
+                    headers.update({'ETag': etag, 'Last-Modified': last_modified})
+                    if self.headers.get('If-None-Match') == etag:
+                        return self._send(304, headers={'ETag': etag})
+                return self._send(200, body, headers)
+
+            match = re.match(r'^/en/comps/(\d+)/', url.path)
+            if match and match.group(1) in competitions:
+                with open(competitions[match.group(1)], 'rb') as f:
+                    return self._send(200, f.read(), {'Content-Type': 'text/html; charset=utf-8'})
+
+            match = re.match(r'^/en/squads/([0-9a-f]{8})/', url.path)
+            if match and match.group(1) in squads:
+                with open(squads[match.group(1)], 'rb') as f:
+                    return self._send(200, f.read(), {'Content-Type': 'text/html; charset=utf-8'})
+
+            self._send(404, b'Not found')
+
+    return StandinHandler
+
+def make_server(fixtures_dir, port=0, delay=0.0, conditional=True, aliases=False):
+    handler = make_handler(
+        load_fixtures(fixtures_dir), delay, conditional, load_competitions(fixtures_dir), load_squads(fixtures_dir),
+        aliases
+    )
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from config import Config
+
+FIELD_GROUPS = {
+    'info': ['general_info'],
+    'stats': ['current_season_stats', 'scouting_report', 'player_overview']
+}
+
+class FreshnessPolicy:
+    def __init__(self, ttls=None):
+        self.ttls = ttls or {
+            'info': Config.INFO_TTL_SECONDS,
+            'stats': Config.STATS_TTL_SECONDS
+        }
+
+    def refreshed_at(self, player, group):
+        return getattr(player, f'{group}_updated_at') or player.updated_at or player.created_at
+
+    def stale_groups(self, player, now=None):
+        now = now or datetime.utcnow()
+        stale = []
+        for group, ttl in self.ttls.items():
+            refreshed_at = self.refreshed_at(player, group)
+            if refreshed_at is None or now - refreshed_at > timedelta(seconds=ttl):
+                stale.append(group)
+        return stale
+
+    def seconds_until_stale(self, player, group, now=None):
+        now = now or datetime.utcnow()
+        refreshed_at = self.refreshed_at(player, group)
+        if refreshed_at is None:
+            return 0
+        return max(0, int(self.ttls[group] - (now - refreshed_at).total_seconds()))
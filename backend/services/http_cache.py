@@ -0,0 +1,89 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+def json_response(body, etag, max_age):
+    matched = matching_etag(etag)
+    response = Response(status=304) if matched else Response(body, mimetype='application/json')
+    response.set_etag(matched or etag)
+    if max_age > 0:
+        response.cache_control.public = True
+        response.cache_control.max_age = int(max_age)
+    else:
+        # Stale rows are served while a refresh runs; clients revalidate.
+        response.cache_control.no_cache = True
+    return response
+
+def matching_etag(etag):
+    # Compressed bodies carry their own ETag ("<etag>-gzip", "<etag>-br"),
+    # and all of them stand for the same row version.
+    for candidate in (etag, f'{etag}-br', f'{etag}-gzip'):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_BYTES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    response.set_data(_compress(body, encoding, etag))
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _compress(body, encoding, etag):
+    # A body with an ETag is the same bytes until the row changes, so its
+    # compressed form is kept instead of being recompressed on every hit.
+    key = (etag, encoding) if etag else None
+    if key is not None:
+        with _compressed_lock:
+            data = _compressed.get(key)
+            if data is not None:
+                _compressed.move_to_end(key)
+                return data
+
+    if encoding == 'br':
+        data = brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, Config.GZIP_LEVEL)
+
+    if key is not None:
+        with _compressed_lock:
+            _compressed[key] = data
+            while len(_compressed) > Config.COMPRESSION_CACHE_ENTRIES:
+                _compressed.popitem(last=False)
+    return data
@@ -0,0 +1,41 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (set in gunicorn.conf.py) and /metrics adds them up, so a scrape sees the
+# whole server rather than whichever worker answered.
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+lookup_stage_seconds = Histogram(
+    'player_lookup_stage_seconds', 'Time spent in each stage of a player lookup', ['stage'], buckets=STAGE_BUCKETS
+)
+searches = Counter('player_searches_total', 'Player searches by how they were answered', ['source'])
+response_cache_lookups = Counter('player_response_cache_lookups_total', 'Response cache lookups', ['result'])
+fbref_responses = Counter('fbref_responses_total', 'fbref responses by HTTP status; "error" for no response', ['status'])
+parse_failures = Counter('player_parse_failures_total', 'Player page parts that could not be parsed', ['section'])
+scrape_jobs_finished = Counter('scrape_jobs_finished_total', 'Finished scrape jobs', ['status'])
+players_rescored = Counter(
+    'players_rescored_total', 'Players re-analyzed for a new analyzer version, by whether the overview changed',
+    ['result']
+)
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        lookup_stage_seconds.labels(stage).observe(time.perf_counter() - started)
+
+def render():
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,6 @@
+import unicodedata
+
+def normalize_name(name):
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    return ' '.join(name.casefold().split())
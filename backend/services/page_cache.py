@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PageCache:
+    def __init__(self, directory=None, keep_versions=None, enabled=None):
+        self.directory = directory or Config.PAGE_CACHE_DIR
+        self.keep_versions = keep_versions or Config.PAGE_CACHE_KEEP_VERSIONS
+        self.enabled = Config.PAGE_CACHE_ENABLED if enabled is None else enabled
+
+    def normalize_url(self, url):
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+    def get(self, url):
+        if not self.enabled:
+            return None
+        try:
+            with open(self._meta_path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, body, headers, content_hash):
+        if not self.enabled:
+            return None
+
+        entry = self.get(url) or {'url': self.normalize_url(url), 'versions': []}
+        now = time.time()
+        entry.update({
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'checked_at': now
+        })
+
+        # A new body is only kept when the sections we read changed, so the
+        # versions on disk are the distinct pages worth re-parsing later.
+        latest = entry['versions'][-1] if entry['versions'] else None
+        if latest is None or content_hash is None or latest['content_hash'] != content_hash:
+            filename = f"{int(now * 1000)}-{uuid.uuid4().hex[:8]}.html.gz"
+            self._write(os.path.join(self._entry_dir(url), filename), gzip.compress(body, 6))
+            entry['versions'].append({'file': filename, 'fetched_at': now, 'content_hash': content_hash})
+
+            for stale in entry['versions'][:-self.keep_versions]:
+                try:
+                    os.remove(os.path.join(self._entry_dir(url), stale['file']))
+                except OSError:
+                    pass
+            entry['versions'] = entry['versions'][-self.keep_versions:]
+
+        self._write(self._meta_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def touch(self, url):
+        entry = self.get(url)
+        if entry is not None:
+            entry['checked_at'] = time.time()
+            self._write(self._meta_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def body(self, url, version=-1):
+        entry = self.get(url)
+        if not entry or not entry['versions']:
+            return None
+        try:
+            with open(os.path.join(self._entry_dir(url), entry['versions'][version]['file']), 'rb') as f:
+                return gzip.decompress(f.read())
+        except (OSError, IndexError):
+            return None
+
+    def _entry_dir(self, url):
+        key = hashlib.sha1(self.normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def _meta_path(self, url):
+        return os.path.join(self._entry_dir(url), 'meta.json')
+
+    def _write(self, path, data):
+        # The cache only saves work; a full disk must not fail the scrape.
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error(f"Error writing page cache file {path}: {str(e)}")
@@ -0,0 +1,77 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from services.parse_worker import init_worker, parse_in_worker
+
+logger = logging.getLogger(__name__)
+
+class ParsePoolBusy(Exception):
+    pass
+
+class ParsePool:
+    # Parsing and scoring a page is pure CPU work that holds the GIL, so with
+    # threaded workers one large page stalls every other request in the
+    # process. With PARSE_POOL_WORKERS set, pages go to a pool of processes
+    # instead. At most max_pending pages are handed to the pool at a time;
+    # callers past that wait up to PARSE_POOL_WAIT_SECONDS for a slot and
+    # then get ParsePoolBusy rather than queueing without bound.
+    def __init__(self, workers=None, max_pending=None, wait_seconds=None):
+        self.workers = Config.PARSE_POOL_WORKERS if workers is None else workers
+        self.max_pending = max_pending or Config.PARSE_POOL_MAX_PENDING or max(self.workers, 1) * 2
+        self.wait_seconds = Config.PARSE_POOL_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def parse(self, html, analyze=True):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise ParsePoolBusy(f"All {self.max_pending} parse slots are busy")
+        try:
+            return self._get_executor().submit(parse_in_worker, html, analyze).result()
+        except BrokenProcessPool:
+            # A pool process died (OOM, killed); the next call starts a new pool.
+            logger.error("Parse pool broke, restarting it")
+            self._discard(self._executor)
+            raise
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Not forked from the calling process: a gunicorn worker has
+                # threads and open connections that a fork would copy. The
+                # fork server preloads the worker module rather than the main
+                # script, so pool processes start from the parser and analyzer
+                # alone (app.py skips create_app when imported as __mp_main__).
+                context = multiprocessing.get_context(Config.PARSE_POOL_START_METHOD)
+                if Config.PARSE_POOL_START_METHOD == 'forkserver':
+                    context.set_forkserver_preload(['services.parse_worker'])
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context, initializer=init_worker
+                )
+                logger.info(f"Started parse pool with {self.workers} processes")
+            return self._executor
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+parse_pool = ParsePool()
@@ -0,0 +1,36 @@
+import time
+
+from services.player_analyzer import analyzers
+from services.player_page_parser import PlayerPageParser
+
+# Everything a parse pool process runs. Pool processes import only this
+# module and what it imports, so it must stay free of the app, the database
+# and anything that starts threads.
+
+def parse_page(parser, analyzer, html, analyze=True):
+    # Returns the parsed player_info (None when the page has no player meta)
+    # with the analysis and its analysis_version merged in, and the seconds
+    # spent per stage. Both are plain dicts, so the result pickles cheaply
+    # out of a pool process.
+    started = time.perf_counter()
+    player_info = parser.parse(html)
+    timings = {'parse': time.perf_counter() - started}
+
+    if player_info is not None and analyze:
+        started = time.perf_counter()
+        analysis = analyzer.analyze_player(player_info)
+        timings['analyze'] = time.perf_counter() - started
+        if 'error' not in analysis:
+            player_info.update(analysis)
+            player_info['analysis_version'] = analyzer.version
+    return player_info, timings
+
+_parser = None
+
+def init_worker():
+    global _parser
+    _parser = PlayerPageParser()
+
+def parse_in_worker(html, analyze):
+    # Each pool process follows analyzer config changes on its own.
+    return parse_page(_parser, analyzers.current(), html, analyze)
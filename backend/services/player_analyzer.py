@@ -1,61 +1,117 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Part of every analysis_version; bump it when a change to the scoring code
+# (rather than to the config file) changes the output.
+SCORING_REVISION = 1
+
 @dataclass
 class StatCategory:
     name: str
     stats: List[str]
     weight: float
 
+@dataclass(frozen=True)
+class StatProfile:
+    categories: Tuple[str, ...]
+    weight: float
+    styles: Tuple[str, ...]
+    traits: Tuple[Tuple[str, str], ...]
+
+def get_position_base(position: str) -> str:
+    position = position.upper()
+    if any(pos in position for pos in ['FW', 'ST', 'CF', 'LW', 'RW']):
+        return 'FW'
+    elif any(pos in position for pos in ['MF', 'CM', 'DM', 'AM']):
+        return 'MF'
+    elif any(pos in position for pos in ['DF', 'CB', 'LB', 'RB']):
+        return 'DF'
+    elif 'GK' in position:
+        return 'GK'
+    return 'MF'
+
+def load_analyzer_config(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def analysis_version(config):
+    encoded = json.dumps([SCORING_REVISION, config], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:12]
+
+def analysis_input_hash(general_info, scouting_report):
+    # What the analysis reads from a player. A row whose stored hash and
+    # version both match would score exactly the same again.
+    general_info = general_info or {}
+    encoded = json.dumps(
+        [general_info.get('name'), general_info.get('position'), general_info.get('age'), scouting_report or []],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
 class PlayerAnalyzer:
-    def __init__(self):
+    def __init__(self, config=None):
+        # The scoring weights live in ANALYZER_CONFIG_PATH so they can be
+        # tuned without a deploy; `version` identifies the config (and
+        # scoring code) a stored player_overview was computed with.
+        if config is None:
+            config = load_analyzer_config(Config.ANALYZER_CONFIG_PATH)
+        self.version = analysis_version(config)
+
         self.categories = {
-            "attacking": StatCategory(
-                name="Attacking",
-                stats=[
-                    "Non-Penalty Goals",
-                    "npxG: Non-Penalty xG",
-                    "Shots Total",
-                    "Assists",
-                    "xAG: Exp. Assisted Goals",
-                    "Shot-Creating Actions"
-                ],
-                weight=0.3
-            ),
-            "possession": StatCategory(
-                name="Possession",
-                stats=[
-                    "Passes Attempted",
-                    "Pass Completion %",
-                    "Progressive Passes",
-                    "Progressive Carries",
-                    "Successful Take-Ons",
-                    "Progressive Passes Rec"
-                ],
-                weight=0.35
-            ),
-            "defensive": StatCategory(
-                name="Defensive",
-                stats=[
-                    "Tackles",
-                    "Interceptions",
-                    "Blocks",
-                    "Clearances",
-                    "Aerials Won"
-                ],
-                weight=0.35
-            )
+            category: StatCategory(name=values['name'], stats=list(values['stats']), weight=values['weight'])
+            for category, values in config['categories'].items()
         }
+        self.position_weights = config['position_weights']
+        self.key_stats = config['key_stats']
+        self.style_groups = config['style_groups']
+        self.position_traits = config['position_traits']
+        self.role_definitions = config['role_definitions']
 
-        self.position_weights = {
-            "FW": {"attacking": 0.5, "possession": 0.35, "defensive": 0.15},
-            "MF": {"attacking": 0.35, "possession": 0.45, "defensive": 0.20},
-            "DF": {"attacking": 0.15, "possession": 0.40, "defensive": 0.45},
-            "GK": {"attacking": 0.05, "possession": 0.35, "defensive": 0.60}
-        }
+        self.stat_profiles = self._build_stat_profiles()
+        self.stat_columns = MappingProxyType({stat: i for i, stat in enumerate(self.stat_profiles)})
+
+    def _build_stat_profiles(self) -> Dict:
+        # Everything the analysis needs to know about a stat name, so a report
+        # is resolved with one dict lookup per row instead of list scans per
+        # category, style and trait.
+        profiles = {}
+
+        def profile(stat):
+            return profiles.setdefault(stat, {'categories': {}, 'styles': {}, 'traits': {}})
+
+        for category, config in self.categories.items():
+            for stat in config.stats:
+                profile(stat)['categories'][category] = None
+        for style, relevant_stats in self.style_groups.items():
+            for stat in relevant_stats:
+                profile(stat)['styles'][style] = None
+        for position, traits in self.position_traits.items():
+            for trait, relevant_stats in traits.items():
+                for stat in relevant_stats:
+                    profile(stat)['traits'][(position, trait)] = None
+
+        return MappingProxyType({
+            stat: StatProfile(
+                categories=tuple(groups['categories']),
+                weight=self.key_stats.get(stat, 1.0),
+                styles=tuple(groups['styles']),
+                traits=tuple(groups['traits'])
+            )
+            for stat, groups in profiles.items()
+        })
 
     def analyze_player(self, player_data: Dict) -> Dict:
         try:
@@ -64,10 +120,14 @@ class PlayerAnalyzer:
             scouting_report = player_data['scouting_report']
 
             position_base = self._get_position_base(position)
-            category_scores = self._calculate_category_scores(scouting_report, position_base)
-            strengths, weaknesses = self._identify_strengths_weaknesses(scouting_report, position_base)
+            category_totals, style_totals, trait_totals, rated_stats = self._accumulate_report(
+                scouting_report,
+                position_base
+            )
+            category_scores = self._calculate_category_scores(category_totals, position_base)
+            strengths, weaknesses = self._identify_strengths_weaknesses(rated_stats)
             overall_rating = self._calculate_overall_rating(category_scores, position_base)
-            playing_style = self._analyze_playing_style(scouting_report, position, category_scores)
+            playing_style = self._analyze_playing_style(style_totals, trait_totals, position_base)
 
             development_analysis = self._analyze_development_needs(
                 age, 
@@ -107,118 +167,367 @@ class PlayerAnalyzer:
             logger.error(f"Error analyzing player: {str(e)}")
             return {"error": "Could not analyze player"}
 
+    def analyze_many(self, players: List[Dict]) -> List[Dict]:
+        results = [None] * len(players)
+        batch = []
+        indexed_reports = []
+
+        for i, player_data in enumerate(players):
+            indexed = self._index_report(player_data)
+            if indexed is None:
+                results[i] = self.analyze_player(player_data)
+            else:
+                batch.append(i)
+                indexed_reports.append(indexed)
+
+        if batch:
+            analyses = self._analyze_batch([players[i] for i in batch], indexed_reports)
+            for i, analysis in zip(batch, analyses):
+                results[i] = analysis
+
+        return results
+
+    def _index_report(self, player_data: Dict):
+        # Maps stat column -> (position in report, stat entry). Anything the
+        # matrix path cannot reproduce exactly (missing fields, odd types, a
+        # stat listed twice, no scored stats) returns None and goes through
+        # analyze_player instead.
+        try:
+            general_info = player_data['general_info']
+            if not isinstance(general_info['position'], str) or type(general_info['age']) is not int:
+                return None
+            general_info['name']
+
+            indexed = {}
+            has_category_stat = False
+            for position, stat in enumerate(player_data['scouting_report']):
+                if type(stat['percentile']) is not int or not isinstance(stat['stat'], str):
+                    return None
+                stat['per_90']
+                column = self.stat_columns.get(stat['stat'])
+                if column is not None:
+                    if column in indexed:
+                        return None
+                    indexed[column] = (position, stat)
+                    has_category_stat = has_category_stat or bool(self.stat_profiles[stat['stat']].categories)
+            return indexed if has_category_stat else None
+        except (KeyError, TypeError):
+            return None
+
+    def _analyze_batch(self, players: List[Dict], indexed_reports: List[Dict]) -> List[Dict]:
+        stat_index = self.stat_columns
+        n_players, n_stats = len(players), len(stat_index)
+        categories = list(self.categories)
+        positions = list(self.position_weights)
+
+        # players x stats percentiles (NaN where missing), plus the position
+        # of each stat in the player's report so sums follow report order.
+        rows, columns, orders, scores = [], [], [], []
+        for row, indexed in enumerate(indexed_reports):
+            for column, (position, stat) in indexed.items():
+                rows.append(row)
+                columns.append(column)
+                orders.append(position)
+                scores.append(stat['percentile'])
+        percentiles = np.full((n_players, n_stats), np.nan)
+        report_order = np.full((n_players, n_stats), n_stats, dtype=np.int64)
+        percentiles[rows, columns] = scores
+        report_order[rows, columns] = orders
+        present = ~np.isnan(percentiles)
+        values = np.where(present, percentiles, 0.0)
+
+        position_names = [player_data['general_info']['position'] for player_data in players]
+        position_bases = [self._get_position_base(position) for position in position_names]
+        position_codes = np.array([positions.index(base) for base in position_bases])
+        position_weights = np.array([[self.position_weights[p][c] for c in categories] for p in positions])
+        player_weights = position_weights[position_codes]
+        ages = np.array([player_data['general_info']['age'] for player_data in players])
+
+        # Category scores
+        category_present = np.zeros((n_players, len(categories)), dtype=bool)
+        category_raw = np.zeros((n_players, len(categories)))
+        for c, category in enumerate(categories):
+            columns = np.array([stat_index[stat] for stat in self.categories[category].stats])
+            stat_weights = np.array([self.key_stats.get(stat, 1.0) for stat in self.categories[category].stats])
+            order = np.argsort(report_order[:, columns], axis=1, kind='stable')
+            weighted = np.take_along_axis(values[:, columns] * stat_weights, order, axis=1)
+            weights = np.take_along_axis(np.where(present[:, columns], stat_weights, 0.0), order, axis=1)
+
+            weighted_sum = np.zeros(n_players)
+            total_weight = np.zeros(n_players)
+            for j in range(len(columns)):
+                weighted_sum = weighted_sum + weighted[:, j]
+                total_weight = total_weight + weights[:, j]
+
+            category_present[:, c] = present[:, columns].any(axis=1)
+            category_raw[:, c] = np.divide(weighted_sum, total_weight, out=np.zeros(n_players), where=total_weight > 0)
+        category_score = np.rint(category_raw)
+        category_contribution = category_raw * player_weights
+
+        # Overall rating
+        total_weighted_score = np.zeros(n_players)
+        total_weight = np.zeros(n_players)
+        for c in range(len(categories)):
+            weight = np.where(category_present[:, c], player_weights[:, c] * player_weights[:, c], 0.0)
+            total_weighted_score = total_weighted_score + np.where(category_present[:, c], category_score[:, c] * weight, 0.0)
+            total_weight = total_weight + weight
+        base_rating = np.divide(total_weighted_score, total_weight, out=np.full(n_players, 70.0), where=total_weight > 0)
+
+        possession = np.where(category_present[:, categories.index('possession')],
+                              category_score[:, categories.index('possession')], 0) \
+            if 'possession' in categories else np.zeros(n_players)
+        passing_bonus = np.select([possession >= 85, possession >= 75, possession >= 65], [8, 6, 4], 0)
+        exceptional = ((category_score >= 85) & category_present).sum(axis=1)
+        overall_rating = np.clip(np.rint(base_rating + passing_bonus + exceptional * 2 + 3), 50, 99).astype(int)
+
+        # Playing style
+        style_names = list(self.style_groups)
+        style_values = np.zeros((n_players, len(style_names)))
+        style_counts = np.zeros((n_players, len(style_names)), dtype=np.int64)
+        for s_i, style in enumerate(style_names):
+            columns = [stat_index[stat] for stat in dict.fromkeys(self.style_groups[style])]
+            style_counts[:, s_i] = present[:, columns].sum(axis=1)
+            style_sums = values[:, columns].sum(axis=1)
+            style_values[:, s_i] = np.divide(style_sums, style_counts[:, s_i], out=np.zeros(n_players),
+                                             where=style_counts[:, s_i] > 0)
+        style_ranking = np.argsort(-style_values, axis=1, kind='stable')
+
+        # Position-specific traits, computed for every trait group and picked
+        # per player by position base.
+        trait_groups = [(p, trait) for p in positions for trait in self.position_traits[p]]
+        trait_counts = np.zeros((n_players, len(trait_groups)), dtype=np.int64)
+        trait_values = np.zeros((n_players, len(trait_groups)))
+        for t_i, (p, trait) in enumerate(trait_groups):
+            columns = [stat_index[stat] for stat in dict.fromkeys(self.position_traits[p][trait])]
+            trait_counts[:, t_i] = present[:, columns].sum(axis=1)
+            trait_values[:, t_i] = np.divide(values[:, columns].sum(axis=1), trait_counts[:, t_i],
+                                             out=np.zeros(n_players), where=trait_counts[:, t_i] > 0)
+        trait_scores = np.rint(trait_values)
+
+        # Strengths and weaknesses: every category stat, weighted by the
+        # player's position weight for its category, best first.
+        stat_category = {}
+        for c, category in enumerate(categories):
+            for stat in self.categories[category].stats:
+                stat_category.setdefault(stat_index[stat], c)
+        rated_columns = np.array(sorted(stat_category))
+        rated_weights = player_weights[:, [stat_category[column] for column in rated_columns]]
+        rated_scores = values[:, rated_columns] * rated_weights
+        rated_present = present[:, rated_columns]
+        rated_ranking = np.lexsort((
+            np.where(rated_present, report_order[:, rated_columns], n_stats),
+            np.where(rated_present, -rated_scores, np.inf)
+        ), axis=1)
+
+        # Potential
+        highest_category = np.where(category_present, category_score, -np.inf).max(axis=1)
+        potential_increase = np.select(
+            [ages <= 19, ages <= 21, ages <= 23, ages <= 25, ages <= 27],
+            [15, 12, 8, 5, 3], 0
+        ).astype(float)
+        potential_increase = np.where(overall_rating >= 85, potential_increase * 0.5,
+                                      np.where(overall_rating <= 65, potential_increase * 1.2, potential_increase))
+        potential_increase = np.where(highest_category >= 85, potential_increase + 2, potential_increase)
+        potential_rating = np.minimum(99, np.rint(overall_rating + potential_increase)).astype(int)
+
+        # Per-player output is assembled from plain lists; indexing numpy
+        # arrays element by element would cost more than the math above.
+        category_present = category_present.tolist()
+        category_score = category_score.astype(int).tolist()
+        category_contribution = category_contribution.tolist()
+        rated_columns = rated_columns.tolist()
+        rated_values = values[:, rated_columns].tolist()
+        rated_scores = rated_scores.tolist()
+        rated_present = rated_present.tolist()
+        rated_ranking = rated_ranking.tolist()
+        style_values = style_values.tolist()
+        style_counts = style_counts.tolist()
+        style_ranking = style_ranking[:, :2].tolist()
+        trait_counts = trait_counts.tolist()
+        trait_values = trait_values.tolist()
+        trait_scores = trait_scores.astype(int).tolist()
+        overall_rating = overall_rating.tolist()
+        potential_rating = potential_rating.tolist()
+
+        results = []
+        for row, player_data in enumerate(players):
+            general_info = player_data['general_info']
+            position = position_names[row]
+            position_base = position_bases[row]
+            age = general_info['age']
+            rating = overall_rating[row]
+
+            category_scores = {}
+            for c, category in enumerate(categories):
+                if category_present[row][c]:
+                    category_scores[category] = {
+                        "score": category_score[row][c],
+                        "weight": self.position_weights[position_base][category],
+                        "contribution": round(category_contribution[row][c], 2)
+                    }
+
+            # Only the top three strengths are reported, so the remaining
+            # rated stats never need to be materialized.
+            strengths = []
+            weaknesses = []
+            for k in rated_ranking[row]:
+                if not rated_present[row][k]:
+                    break
+                percentile = rated_values[row][k]
+                if percentile >= 75:
+                    if len(strengths) == 3:
+                        continue
+                    target = strengths
+                elif percentile <= 35:
+                    target = weaknesses
+                else:
+                    continue
+                stat = indexed_reports[row][rated_columns[k]][1]
+                target.append({
+                    "stat": stat['stat'],
+                    "percentile": stat['percentile'],
+                    "value": stat['per_90'],
+                    "weighted_score": rated_scores[row][k],
+                    "category": categories[stat_category[rated_columns[k]]]
+                })
+
+            characteristics = {
+                style: (style_values[row][s_i] if style_counts[row][s_i] else 0)
+                for s_i, style in enumerate(style_names)
+            }
+            traits_analysis = {}
+            for t_i, (p, trait) in enumerate(trait_groups):
+                if p == position_base and trait_counts[row][t_i]:
+                    traits_analysis[trait] = {
+                        "score": trait_scores[row][t_i],
+                        "level": self._get_trait_level(trait_values[row][t_i]),
+                        "percentile": trait_scores[row][t_i]
+                    }
+            playing_style = {
+                "primary_style": style_names[style_ranking[row][0]].replace('_', ' ').title(),
+                "secondary_style": style_names[style_ranking[row][1]].replace('_', ' ').title(),
+                "style_characteristics": characteristics,
+                "position_specific_traits": {
+                    "position_role": self._determine_specific_role(traits_analysis, position_base),
+                    "key_traits": traits_analysis
+                }
+            }
+
+            development_analysis = self._analyze_development_needs(age, weaknesses, category_scores, position_base)
+
+            results.append({
+                "player_overview": {
+                    "overall_rating": rating,
+                    "summary": self._generate_detailed_summary(
+                        general_info['name'],
+                        position,
+                        age,
+                        rating,
+                        category_scores,
+                        playing_style
+                    ),
+                    "performance_profile": {
+                        "category_scores": category_scores,
+                        "key_strengths": strengths[:3],
+                        "areas_for_improvement": weaknesses[:3],
+                        "playing_style": playing_style
+                    },
+                    "development_analysis": development_analysis,
+                    "potential": {
+                        "current_rating": rating,
+                        "potential_rating": potential_rating[row],
+                        "development_timeframe": self._estimate_development_timeframe(age),
+                        "key_development_areas": development_analysis['priority_areas']
+                    }
+                }
+            })
+
+        return results
+
     def _get_position_base(self, position: str) -> str:
-        position = position.upper()
-        if any(pos in position for pos in ['FW', 'ST', 'CF', 'LW', 'RW']):
-            return 'FW'
-        elif any(pos in position for pos in ['MF', 'CM', 'DM', 'AM']):
-            return 'MF'
-        elif any(pos in position for pos in ['DF', 'CB', 'LB', 'RB']):
-            return 'DF'
-        elif 'GK' in position:
-            return 'GK'
-        return 'MF' 
-
-    def _calculate_category_scores(self, scouting_report: List, position: str) -> Dict:
+        return get_position_base(position)
+
+    def _accumulate_report(self, scouting_report: List, position_base: str) -> tuple:
+        trait_position = position_base if position_base in self.position_traits else "MF"
+        position_weights = self.position_weights[position_base]
+
+        # [weighted sum, total weight, stat count] per category and
+        # [percentile sum, stat count] per style and trait, filled in report
+        # order so sums and tie-breaks match the report.
+        category_totals = {category: [0, 0, 0] for category in self.categories}
+        style_totals = {style: [0, 0] for style in self.style_groups}
+        trait_totals = {trait: [0, 0] for trait in self.position_traits[trait_position]}
+        rated_stats = []
+
+        for stat in scouting_report:
+            profile = self.stat_profiles.get(stat['stat'])
+            if profile is None:
+                continue
+
+            percentile = stat['percentile']
+            for category in profile.categories:
+                totals = category_totals[category]
+                totals[0] += percentile * profile.weight
+                totals[1] += profile.weight
+                totals[2] += 1
+            if profile.categories:
+                category = profile.categories[0]
+                rated_stats.append({
+                    "stat": stat['stat'],
+                    "percentile": percentile,
+                    "value": stat['per_90'],
+                    "weighted_score": percentile * position_weights[category],
+                    "category": category
+                })
+            for style in profile.styles:
+                style_totals[style][0] += percentile
+                style_totals[style][1] += 1
+            for position, trait in profile.traits:
+                if position == trait_position:
+                    trait_totals[trait][0] += percentile
+                    trait_totals[trait][1] += 1
+
+        rated_stats.sort(key=lambda x: x['weighted_score'], reverse=True)
+        return category_totals, style_totals, trait_totals, rated_stats
+
+    def _calculate_category_scores(self, category_totals: Dict, position: str) -> Dict:
         category_scores = {}
 
-        key_stats = {
-            "Pass Completion %": 1.3,
-            "Progressive Passes": 1.3,
-            "Progressive Carries": 1.2,
-            "Shot-Creating Actions": 1.2,
-            "Assists": 1.2,
-            "Non-Penalty Goals": 1.2,
-            "Tackles": 1.1,
-            "Interceptions": 1.1,
-            "Aerials Won": 1.1
-        }
-        
-        for category, config in self.categories.items():
-            relevant_stats = []
-            weighted_sum = 0
-            total_weight = 0
-            
-            for stat in scouting_report:
-                if stat['stat'] in config.stats:
-                    # Apply individual stat weight
-                    stat_weight = key_stats.get(stat['stat'], 1.0)
-                    weighted_sum += stat['percentile'] * stat_weight
-                    total_weight += stat_weight
-                    relevant_stats.append(stat)
-            
-            if relevant_stats:
+        for category, (weighted_sum, total_weight, count) in category_totals.items():
+            if count:
                 score = weighted_sum / total_weight if total_weight > 0 else 0
 
                 weight = self.position_weights[position][category]
-                
+
                 category_scores[category] = {
                     "score": round(score),
                     "weight": weight,
                     "contribution": round(score * weight, 2)
                 }
-        
+
         return category_scores
 
-    def _identify_strengths_weaknesses(self, scouting_report: List, position: str) -> tuple:
-        position_weights = self.position_weights[position]
-        
-        rated_stats = []
-        for stat in scouting_report:
-            for category, config in self.categories.items():
-                if stat['stat'] in config.stats:
-                    weight = position_weights[category]
-                    rated_stats.append({
-                        "stat": stat['stat'],
-                        "percentile": stat['percentile'],
-                        "value": stat['per_90'],
-                        "weighted_score": stat['percentile'] * weight,
-                        "category": category
-                    })
-                    break
-  
-        rated_stats.sort(key=lambda x: x['weighted_score'], reverse=True)
-        
+    def _identify_strengths_weaknesses(self, rated_stats: List) -> tuple:
         strengths = [stat for stat in rated_stats if stat['percentile'] >= 75]
         weaknesses = [stat for stat in rated_stats if stat['percentile'] <= 35]
-        
+
         return strengths, weaknesses
 
-    def _analyze_playing_style(self, scouting_report: List, position: str, category_scores: Dict) -> Dict:
+    def _analyze_playing_style(self, style_totals: Dict, trait_totals: Dict, position_base: str) -> Dict:
         characteristics = {
-            "possession_play": self._calculate_style_characteristic(
-                scouting_report,
-                ["Pass Completion %", "Progressive Passes", "Progressive Carries"]
-            ),
-            "attacking_threat": self._calculate_style_characteristic(
-                scouting_report,
-                ["Non-Penalty Goals", "Shot-Creating Actions", "xAG: Exp. Assisted Goals"]
-            ),
-            "defensive_contribution": self._calculate_style_characteristic(
-                scouting_report,
-                ["Tackles", "Interceptions", "Blocks"]
-            )
+            style: total / count if count else 0
+            for style, (total, count) in style_totals.items()
         }
 
         styles = sorted(characteristics.items(), key=lambda x: x[1], reverse=True)
-        
+
         return {
             "primary_style": styles[0][0].replace('_', ' ').title(),
             "secondary_style": styles[1][0].replace('_', ' ').title(),
             "style_characteristics": characteristics,
-            "position_specific_traits": self._identify_position_specific_traits(
-                scouting_report,
-                position
-            )
+            "position_specific_traits": self._identify_position_specific_traits(trait_totals, position_base)
         }
 
-    def _calculate_style_characteristic(self, scouting_report: List, relevant_stats: List) -> float:
-        relevant_values = [
-            stat['percentile'] for stat in scouting_report 
-            if stat['stat'] in relevant_stats
-        ]
-        return sum(relevant_values) / len(relevant_values) if relevant_values else 0
-
     def _analyze_development_needs(self, age: int, weaknesses: List, 
                                  category_scores: Dict, position: str) -> Dict:
         development_timeframe = self._estimate_development_timeframe(age)
@@ -360,52 +669,20 @@ class PlayerAnalyzer:
             return 4
         return 0
 
-    def _identify_position_specific_traits(self, scouting_report: List, position: str) -> Dict:
-        position_traits = {
-            "FW": {
-                "finishing": ["Non-Penalty Goals", "npxG: Non-Penalty xG"],
-                "creativity": ["Assists", "xAG: Exp. Assisted Goals", "Shot-Creating Actions"],
-                "movement": ["Progressive Passes Rec"]
-            },
-            "MF": {
-                "playmaking": ["Progressive Passes", "Assists", "xAG: Exp. Assisted Goals"],
-                "ball_control": ["Pass Completion %", "Progressive Carries", "Successful Take-Ons"],
-                "work_rate": ["Shot-Creating Actions", "Tackles", "Interceptions"]
-            },
-            "DF": {
-                "defending": ["Tackles", "Interceptions", "Blocks"],
-                "aerial_ability": ["Aerials Won", "Clearances"],
-                "build_up": ["Progressive Passes", "Pass Completion %"]
-            },
-            "GK": {
-                "shot_stopping": ["Save Percentage", "Goals Against"],
-                "distribution": ["Pass Completion %", "Passes Attempted"],
-                "commanding": ["Crosses Stopped", "Clearances"]
-            }
-        }
-
-        base_position = self._get_position_base(position)
-        relevant_traits = position_traits.get(base_position, position_traits["MF"])
-        
+    def _identify_position_specific_traits(self, trait_totals: Dict, position_base: str) -> Dict:
         traits_analysis = {}
 
-        for trait_name, relevant_stats in relevant_traits.items():
-            trait_scores = []
-            
-            for stat in scouting_report:
-                if stat['stat'] in relevant_stats:
-                    trait_scores.append(stat['percentile'])
-            
-            if trait_scores:
-                avg_score = sum(trait_scores) / len(trait_scores)
+        for trait_name, (total, count) in trait_totals.items():
+            if count:
+                avg_score = total / count
                 traits_analysis[trait_name] = {
                     "score": round(avg_score),
                     "level": self._get_trait_level(avg_score),
                     "percentile": round(avg_score)
                 }
-        
+
         return {
-            "position_role": self._determine_specific_role(traits_analysis, position),
+            "position_role": self._determine_specific_role(traits_analysis, position_base),
             "key_traits": traits_analysis
         }
 
@@ -427,40 +704,46 @@ class PlayerAnalyzer:
         else:
             return "Developing"
 
-    def _determine_specific_role(self, traits_analysis: Dict, position: str) -> str:
-        base_position = self._get_position_base(position)
-
-        sorted_traits = sorted(
-            traits_analysis.items(),
-            key=lambda x: x[1]['score'],
-            reverse=True
-        )
-  
-        role_definitions = {
-            "FW": {
-                "finishing": "Goal Poacher",
-                "creativity": "Creative Forward",
-                "movement": "Mobile Striker"
-            },
-            "MF": {
-                "playmaking": "Playmaker",
-                "ball_control": "Technical Midfielder",
-                "work_rate": "Box-to-Box Midfielder"
-            },
-            "DF": {
-                "defending": "No-Nonsense Defender",
-                "aerial_ability": "Aerial Specialist",
-                "build_up": "Ball-Playing Defender"
-            },
-            "GK": {
-                "shot_stopping": "Shot Stopper",
-                "distribution": "Sweeper Keeper",
-                "commanding": "Traditional Keeper"
-            }
-        }
-        
-        if sorted_traits:
-            primary_trait = sorted_traits[0][0]
-            return role_definitions.get(base_position, {}).get(primary_trait, "Complete Player")
-        
-        return "Versatile Player"
\ No newline at end of file
+    def _determine_specific_role(self, traits_analysis: Dict, position_base: str) -> str:
+        if traits_analysis:
+            primary_trait = max(traits_analysis, key=lambda trait: traits_analysis[trait]['score'])
+            return self.role_definitions.get(position_base, {}).get(primary_trait, "Complete Player")
+        return "Versatile Player"
+
+class AnalyzerSource:
+    # Hands out the PlayerAnalyzer for the current contents of the config
+    # file, checking its mtime at most every ANALYZER_RELOAD_SECONDS. A
+    # reload builds a new analyzer (and with it the stat profiles and
+    # columns) instead of changing the one in use, so an analysis already
+    # running finishes on the config it started with. A file that fails to
+    # load keeps the previous analyzer.
+    def __init__(self, path=None, check_interval=None):
+        self.path = path or Config.ANALYZER_CONFIG_PATH
+        self.check_interval = Config.ANALYZER_RELOAD_SECONDS if check_interval is None else check_interval
+        self._lock = threading.Lock()
+        self._analyzer = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def current(self):
+        analyzer = self._analyzer
+        if analyzer is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return analyzer
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if self._analyzer is None or mtime != self._mtime:
+                    analyzer = PlayerAnalyzer(load_analyzer_config(self.path))
+                    if self._analyzer is not None and analyzer.version != self._analyzer.version:
+                        logger.info(f"Analyzer config {self.path} reloaded, version {analyzer.version}")
+                    self._analyzer, self._mtime = analyzer, mtime
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if self._analyzer is None:
+                    raise
+                logger.error(f"Keeping analyzer version {self._analyzer.version}, "
+                             f"could not load {self.path}: {str(e)}")
+            return self._analyzer
+
+analyzers = AnalyzerSource()
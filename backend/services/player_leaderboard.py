@@ -0,0 +1,116 @@
+import base64
+import json
+
+from sqlalchemy import and_, tuple_
+from sqlalchemy.orm import load_only
+
+from config import Config
+from database import db
+from models.player import Player
+from models.player_scouting_stat import PlayerScoutingStat
+from models.player_season_stat import PlayerSeasonStat
+
+PROFILE_SORTS = {
+    'overall_rating': Player.overall_rating,
+    'potential_rating': Player.potential_rating,
+    'age': Player.age
+}
+SCOUTING_METRICS = ('percentile', 'per_90')
+POSITION_BASES = ('FW', 'MF', 'DF', 'GK')
+
+class PlayerLeaderboard:
+    def top(self, sort='overall_rating', metric='percentile', order='desc', position=None, min_age=None,
+            max_age=None, club=None, national_team=None, competition=None, limit=None, cursor=None):
+        limit = max(1, min(limit or Config.LEADERBOARD_DEFAULT_LIMIT, Config.LEADERBOARD_MAX_LIMIT))
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+
+        # Profile sorts walk the players indexes; a scouting stat walks the
+        # (stat, metric, player_id) index of player_scouting_stats.
+        if sort in PROFILE_SORTS:
+            value = PROFILE_SORTS[sort]
+            tiebreak = Player.id
+            query = db.session.query(Player, value)
+        else:
+            if metric not in SCOUTING_METRICS:
+                raise ValueError(f"metric must be one of {', '.join(SCOUTING_METRICS)}")
+            value = getattr(PlayerScoutingStat, metric)
+            tiebreak = PlayerScoutingStat.player_id
+            query = db.session.query(Player, value).join(
+                PlayerScoutingStat,
+                and_(PlayerScoutingStat.player_id == Player.id, PlayerScoutingStat.stat == sort)
+            )
+
+        query = query.options(load_only(
+            Player.id, Player.name, Player.general_info, Player.position_base, Player.age,
+            Player.club, Player.national_team, Player.overall_rating
+        )).filter(value.isnot(None))
+
+        if position:
+            position = position.upper()
+            if position not in POSITION_BASES:
+                raise ValueError(f"position must be one of {', '.join(POSITION_BASES)}")
+            query = query.filter(Player.position_base == position)
+        if min_age is not None:
+            query = query.filter(Player.age >= min_age)
+        if max_age is not None:
+            query = query.filter(Player.age <= max_age)
+        if club:
+            query = query.filter(Player.club == club)
+        if national_team:
+            query = query.filter(Player.national_team == national_team)
+        if competition:
+            query = query.filter(
+                db.session.query(PlayerSeasonStat.player_id).filter(
+                    PlayerSeasonStat.player_id == Player.id,
+                    PlayerSeasonStat.competition == competition
+                ).exists()
+            )
+
+        descending = order == 'desc'
+        if cursor:
+            last_value, last_id = self.decode_cursor(cursor)
+            if descending:
+                query = query.filter(tuple_(value, tiebreak) < tuple_(last_value, last_id))
+            else:
+                query = query.filter(tuple_(value, tiebreak) > tuple_(last_value, last_id))
+
+        if descending:
+            query = query.order_by(value.desc(), tiebreak.desc())
+        else:
+            query = query.order_by(value.asc(), tiebreak.asc())
+
+        # One extra row tells us whether another page exists.
+        rows = query.limit(limit + 1).all()
+        next_cursor = self.encode_cursor(rows[limit - 1][1], rows[limit - 1][0].id) if len(rows) > limit else None
+
+        results = []
+        for player, sort_value in rows[:limit]:
+            general_info = player.general_info or {}
+            results.append({
+                'id': player.id,
+                'name': general_info.get('name') or player.name,
+                'position': general_info.get('position'),
+                'position_base': player.position_base,
+                'age': player.age,
+                'club': player.club,
+                'national_team': player.national_team,
+                'photo_url': general_info.get('photo_url'),
+                'overall_rating': player.overall_rating,
+                'value': sort_value
+            })
+        return results, next_cursor
+
+    def encode_cursor(self, value, player_id):
+        return base64.urlsafe_b64encode(json.dumps([value, player_id]).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            value, player_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(value, (int, float)) or not isinstance(player_id, int):
+            raise ValueError("Invalid cursor")
+        return value, player_id
+
+player_leaderboard = PlayerLeaderboard()
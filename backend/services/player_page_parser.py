@@ -0,0 +1,294 @@
+import hashlib
+import io
+import logging
+import re
+from datetime import datetime
+
+from lxml import etree
+
+from services.metrics import parse_failures
+
+STAT_COLUMNS = {
+    ('p1', 1): 'matches',
+    ('p1', 2): 'minutes',
+    ('p1', 3): 'goals',
+    ('p1', 4): 'assists',
+    ('p2', 1): 'expected_goals',
+    ('p2', 2): 'non_penalty_xg',
+    ('p2', 3): 'expected_assists',
+    ('p3', 1): 'shot_creating_actions',
+    ('p3', 2): 'goal_creating_actions'
+}
+
+# Debug lines use lazy %-formatting: they sit on every parse and cost nothing
+# while debug logging is off.
+logger = logging.getLogger(__name__)
+
+DIV_TOKENS = re.compile(rb'<!--.*?-->|<div\b[^>]*>|</div\s*>', re.S | re.I)
+DIV_ATTRIBUTES = re.compile(rb'''\b(id|class)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.I)
+
+class PlayerPageParser:
+    def extract_age(self, birth_date_text):
+        try:
+            if not birth_date_text:
+                return None
+
+            age_match = re.search(r'\(Age: (\d+)', birth_date_text)
+            if age_match:
+                return int(age_match.group(1))
+
+            birth_date = datetime.strptime(birth_date_text.strip(), '%B %d, %Y')
+            today = datetime.today()
+            age = today.year - birth_date.year
+
+            if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
+                age -= 1
+
+            return age
+
+        except Exception as e:
+            logger.debug("Error extracting age: %s", e)
+            parse_failures.labels('age').inc()
+            return None
+
+    def parse(self, html):
+        sections = self._extract_sections(html)
+
+        if 'meta' not in sections:
+            return None
+
+        player_info = {'general_info': sections['meta']}
+
+        if 'stats' in sections:
+            player_info['current_season_stats'] = sections['stats']
+
+        if 'scouting' in sections:
+            player_info['scouting_report'] = sections['scouting']
+        else:
+            logger.debug("No scouting report div found")
+            parse_failures.labels('scouting_report').inc()
+            player_info['scouting_report'] = []
+
+        return player_info
+
+    def fingerprint(self, html):
+        # Hash of the raw markup of the sections parse() reads. The sections
+        # are found with a regex scan of div tags, so an unchanged page is
+        # recognized without building a tree.
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+
+        sections = {}
+        open_divs = []
+        for match in DIV_TOKENS.finditer(html):
+            token = match.group(0)
+            if token.startswith(b'<!--'):
+                continue
+
+            if token.startswith(b'</'):
+                if open_divs:
+                    name, start = open_divs.pop()
+                    if name:
+                        sections[name] = html[start:match.end()]
+                continue
+
+            name = self._raw_section_name(token)
+            if name in sections or any(name == open_name for open_name, _ in open_divs):
+                name = None
+            open_divs.append((name, match.start()))
+
+        if not sections:
+            return None
+
+        digest = hashlib.sha256()
+        for name in ('meta', 'stats', 'scouting'):
+            if name in sections:
+                digest.update(name.encode('ascii') + b'\0' + sections[name] + b'\0')
+        return digest.hexdigest()
+
+    def _raw_section_name(self, tag):
+        attributes = {}
+        for match in DIV_ATTRIBUTES.finditer(tag):
+            value = match.group(2) if match.group(2) is not None else match.group(3) or match.group(4) or b''
+            attributes.setdefault(match.group(1).lower().decode('ascii'), value.decode('utf-8', 'replace'))
+
+        element_id = attributes.get('id', '')
+        if element_id == 'meta':
+            return 'meta'
+        if element_id.startswith('div_scout_summary_'):
+            return 'scouting'
+        if 'stats_pullout' in attributes.get('class', '').split():
+            return 'stats'
+        return None
+
+    def _section_name(self, element):
+        if element.tag != 'div':
+            return None
+
+        element_id = element.get('id') or ''
+        if element_id == 'meta':
+            return 'meta'
+        if element_id.startswith('div_scout_summary_'):
+            return 'scouting'
+        if 'stats_pullout' in self._classes(element):
+            return 'stats'
+        return None
+
+    def _extract_sections(self, html):
+        # Walks the document once. The first #meta, .stats_pullout and
+        # div_scout_summary_* divs are extracted as soon as they are complete;
+        # everything outside them is freed right after it has been parsed.
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+
+        extractors = {
+            'meta': self._parse_meta,
+            'stats': self._parse_season_stats,
+            'scouting': self._parse_scouting_report
+        }
+        sections = {}
+        open_sections = []
+
+        for event, element in etree.iterparse(io.BytesIO(html), events=('start', 'end'), html=True,
+                                              remove_comments=True):
+            if event == 'start':
+                name = self._section_name(element)
+                if name and name not in sections and all(name != open_name for open_name, _ in open_sections):
+                    open_sections.append((name, element))
+                continue
+
+            if open_sections and open_sections[-1][1] is element:
+                name, _ = open_sections.pop()
+                sections[name] = extractors[name](element)
+
+            if open_sections:
+                continue
+
+            element.clear(keep_tail=False)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+        return sections
+
+    def _text(self, element):
+        return ''.join(element.itertext()) if element is not None else ''
+
+    def _parse_meta(self, meta_div):
+        birth_date_element = meta_div.find('.//span[@id="necro-birth"]')
+        birth_date_text = self._text(birth_date_element).strip() if birth_date_element is not None else None
+
+        image = meta_div.find('.//img')
+        heading = meta_div.find('.//h1')
+
+        general_info = {
+            'photo_url': image.get('src') if image is not None else None,
+            'name': self._text(heading).strip() if heading is not None else None,
+            'position': None,
+            'age': self.extract_age(birth_date_text),
+            'national_team': None,
+            'club': None
+        }
+
+        for p in meta_div.iter('p'):
+            text = self._text(p)
+            if general_info['position'] is None and 'Position:' in text:
+                general_info['position'] = text.split('▪')[0].replace('Position:', '').strip()
+            if general_info['national_team'] is None and 'National Team:' in text:
+                general_info['national_team'] = self._text(p.find('.//a')).strip()
+            if general_info['club'] is None and 'Club:' in text:
+                general_info['club'] = self._text(p.find('.//a')).strip()
+
+        return general_info
+
+    def _element_index(self, element):
+        index = 1
+        sibling = element.getprevious()
+        while sibling is not None:
+            if isinstance(sibling.tag, str):
+                index += 1
+            sibling = sibling.getprevious()
+        return index
+
+    def _classes(self, element):
+        return (element.get('class') or '').split()
+
+    def _is_competition_label(self, strong):
+        # Same elements as the CSS selector "div > div > p strong".
+        for ancestor in strong.iterancestors('p'):
+            parent = ancestor.getparent()
+            grandparent = parent.getparent() if parent is not None else None
+            if parent is not None and parent.tag == 'div' and grandparent is not None and grandparent.tag == 'div':
+                return True
+        return False
+
+    def _stat_columns(self, p):
+        # Same elements as "div.<group> div:nth-child(<n>) p" for each entry
+        # of STAT_COLUMNS.
+        columns = []
+        ancestors = list(p.iterancestors())
+        for i, ancestor in enumerate(ancestors):
+            if ancestor.tag != 'div':
+                continue
+            index = self._element_index(ancestor)
+            for outer in ancestors[i + 1:]:
+                if outer.tag != 'div':
+                    continue
+                for group in ('p1', 'p2', 'p3'):
+                    column = STAT_COLUMNS.get((group, index))
+                    if column and group in self._classes(outer) and column not in columns:
+                        columns.append(column)
+        return columns
+
+    def _parse_season_stats(self, stats_div):
+        competitions = []
+        values = {column: [] for column in STAT_COLUMNS.values()}
+
+        for element in stats_div.iter('strong', 'p'):
+            if element.tag == 'strong':
+                if self._is_competition_label(element):
+                    label = self._text(element).strip()
+                    if not label.startswith('20'):
+                        competitions.append(label)
+            else:
+                for column in self._stat_columns(element):
+                    values[column].append(self._text(element).strip())
+
+        logger.debug("Found competitions: %s", competitions)
+
+        current_season_stats = {}
+        for i, competition in enumerate(competitions):
+            try:
+                current_season_stats[competition] = {
+                    column: values[column][i] for column in STAT_COLUMNS.values()
+                }
+            except IndexError as e:
+                logger.warning(f"Error extracting stats for {competition}: {e}")
+                parse_failures.labels('season_stats').inc()
+                current_season_stats[competition] = {column: "0" for column in STAT_COLUMNS.values()}
+
+        return current_season_stats
+
+    def _parse_scouting_report(self, scouting_div):
+        logger.debug("Using scouting div with ID: %s", scouting_div.get('id', 'unknown'))
+
+        scouting_report = []
+        for row in scouting_div.iterfind('.//tbody//tr'):
+            if 'spacer' in self._classes(row):
+                continue
+
+            try:
+                stat_name = self._text(row.find('.//th[@data-stat="statistic"]')).strip()
+                per90_value = self._text(row.find('.//td[@data-stat="per90"]')).strip()
+                percentile = self._text(row.find('.//td[@data-stat="percentile"]').find('.//div')).strip()
+
+                scouting_report.append({
+                    'stat': stat_name,
+                    'per_90': per90_value,
+                    'percentile': int(percentile)
+                })
+            except Exception as e:
+                logger.debug("Error processing stat row: %s", e)
+                parse_failures.labels('scouting_row').inc()
+                continue
+
+        return scouting_report
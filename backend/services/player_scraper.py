@@ -1,180 +1,151 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+import logging
 import re
-from datetime import datetime
 
-from services.player_analyzer import PlayerAnalyzer
+import requests
+
+from services.fbref_client import FbrefClient, UpstreamBusyError, UpstreamUnavailableError
+from services.metrics import lookup_stage_seconds, parse_failures, timed
+from services.page_cache import PageCache
+from services.parse_pool import ParsePoolBusy, parse_pool
+from services.parse_worker import parse_page
+from services.player_analyzer import analyzers
+from services.player_page_parser import PlayerPageParser
+
+logger = logging.getLogger(__name__)
 
 class PlayerScraper:
-    def __init__(self):
-        self.analyzer = PlayerAnalyzer()
+    def __init__(self, client=None, page_cache=None):
+        self.client = client or FbrefClient()
+        self.parser = PlayerPageParser()
+        self.page_cache = page_cache or PageCache()
 
-    def extract_age(self, birth_date_text):
-        try:
-            if not birth_date_text:
-                return None
-
-            age_match = re.search(r'\(Age: (\d+)', birth_date_text)
-            if age_match:
-                return int(age_match.group(1))
-
-            birth_date = datetime.strptime(birth_date_text.strip(), '%B %d, %Y')
-            today = datetime.today()
-            age = today.year - birth_date.year
-
-            if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-                age -= 1
-                
-            return age
-            
-        except Exception as e:
-            print(f"Error extracting age: {e}")
-            return None
+    @property
+    def analyzer(self):
+        return analyzers.current()
 
-    def search_player(self, name):
+    def search_player(self, name, analyze=True):
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            search_url = f"https://fbref.com/search/search.fcgi?search={quote(name)}"
-            response = requests.get(search_url, headers=headers)
-            
+            with timed('fetch'):
+                response = self.client.search(name)
+
+            if response.status_code != 200:
+                return {
+                    'success': False,
+                    'error': f'fbref search failed (HTTP {response.status_code})'
+                }
+
             if '/players/' not in response.url:
                 return {
                     'success': False,
                     'error': 'Player not found'
                 }
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            meta_div = soup.find('div', id='meta')
-            
-            if not meta_div:
+            self.page_cache.put(response.url, response.content, response.headers,
+                                self.parser.fingerprint(response.content))
+            return self.build_result(response.url, response.content, analyze)
+
+        except Exception as e:
+            return self._failed(e)
+
+    def fetch_player(self, url, analyze=True):
+        try:
+            with timed('fetch'):
+                response = self.client.get(url)
+
+            if response.status_code != 200 or '/players/' not in response.url:
                 return {
                     'success': False,
-                    'error': 'Could not find player info'
+                    'error': f'Could not load player page (HTTP {response.status_code})'
                 }
 
-            birth_date_element = meta_div.find('span', id='necro-birth')
-            birth_date_text = birth_date_element.text.strip() if birth_date_element else None
-
-            player_info = {
-                'general_info': {
-                    'photo_url': meta_div.find('img')['src'] if meta_div.find('img') else None,
-                    'name': meta_div.find('h1').text.strip() if meta_div.find('h1') else None,
-                    'position': next((p.text.split('▪')[0].replace('Position:', '').strip() 
-                                   for p in meta_div.find_all('p') if 'Position:' in p.text), None),
-                    'age': self.extract_age(birth_date_text),
-                    'national_team': next((p.find('a').text.strip() 
-                                        for p in meta_div.find_all('p') if 'National Team:' in p.text), None),
-                    'club': next((p.find('a').text.strip() 
-                                for p in meta_div.find_all('p') if 'Club:' in p.text), None),
+            self.page_cache.put(response.url, response.content, response.headers,
+                                self.parser.fingerprint(response.content))
+            return self.build_result(response.url, response.content, analyze)
+
+        except Exception as e:
+            return self._failed(e)
+
+    def refresh_player(self, url, analyze=True):
+        # Re-fetches a known player page. Nothing is parsed or analyzed when
+        # fbref answers 304 or the sections we read hash the same as the
+        # cached copy; the result then only carries 'unchanged': True.
+        try:
+            cached = self.page_cache.get(url)
+            with timed('fetch'):
+                response = self.client.get(url, headers=self.page_cache.conditional_headers(cached))
+
+            if response.status_code == 304 and cached:
+                self.page_cache.touch(url)
+                return self._unchanged(url)
+
+            if response.status_code != 200 or '/players/' not in response.url:
+                return {
+                    'success': False,
+                    'error': f'Could not refresh player page (HTTP {response.status_code})'
                 }
-            }
 
-            stats_div = soup.find('div', class_='stats_pullout')
-            if stats_div:
-                competition_elements = stats_div.select('div > div > p strong')
-                competitions = [comp.text.strip() for comp in competition_elements 
-                              if not comp.text.strip().startswith('20')]
-                print(f"\nFound competitions: {competitions}")
-                
-                current_season_stats = {}
-   
-                matches = [p.text.strip() for p in stats_div.select('div.p1 div:nth-child(1) p')]
-                minutes = [p.text.strip() for p in stats_div.select('div.p1 div:nth-child(2) p')]
-                goals = [p.text.strip() for p in stats_div.select('div.p1 div:nth-child(3) p')]
-                assists = [p.text.strip() for p in stats_div.select('div.p1 div:nth-child(4) p')]
-                xg = [p.text.strip() for p in stats_div.select('div.p2 div:nth-child(1) p')]
-                npxg = [p.text.strip() for p in stats_div.select('div.p2 div:nth-child(2) p')]
-                xa = [p.text.strip() for p in stats_div.select('div.p2 div:nth-child(3) p')]
-                sca = [p.text.strip() for p in stats_div.select('div.p3 div:nth-child(1) p')]
-                gca = [p.text.strip() for p in stats_div.select('div.p3 div:nth-child(2) p')]
-                
-                for i, competition in enumerate(competitions):
-                    print(f"\nProcessing {competition} (index {i}):")
-                    
-                    try:
-                        stats = {
-                            'matches': matches[i],
-                            'minutes': minutes[i],
-                            'goals': goals[i],
-                            'assists': assists[i],
-                            'expected_goals': xg[i],
-                            'non_penalty_xg': npxg[i],
-                            'expected_assists': xa[i],
-                            'shot_creating_actions': sca[i],
-                            'goal_creating_actions': gca[i]
-                        }
-                        print(f"Extracted stats: {stats}")
-                        current_season_stats[competition] = stats
-                        
-                    except Exception as e:
-                        print(f"Error extracting stats for {competition}: {e}")
-                        current_season_stats[competition] = {
-                            'matches': "0",
-                            'minutes': "0",
-                            'goals': "0",
-                            'assists': "0",
-                            'expected_goals': "0",
-                            'non_penalty_xg': "0",
-                            'expected_assists': "0",
-                            'shot_creating_actions': "0",
-                            'goal_creating_actions': "0"
-                        }
-                
-                player_info['current_season_stats'] = current_season_stats
-
-            scouting_report = []
-
-            scouting_divs = soup.find_all('div', id=lambda x: x and x.startswith('div_scout_summary_'))
-            print(f"Found {len(scouting_divs)} scouting report divs")
-            
-            if scouting_divs:
-                scouting_div = scouting_divs[0]
-                print(f"Using scouting div with ID: {scouting_div.get('id', 'unknown')}")
-                
-                stat_rows = scouting_div.select('tbody tr')
-                print(f"Found {len(stat_rows)} stat rows")
-                
-                for row in stat_rows:
-                    if 'spacer' in row.get('class', []):
-                        continue
-                        
-                    try:
-                        stat_name = row.find('th', {'data-stat': 'statistic'}).text.strip()
-                        per90_value = row.find('td', {'data-stat': 'per90'}).text.strip()
-                        percentile = row.find('td', {'data-stat': 'percentile'}).select_one('div').text.strip()
-                        
-                        scouting_report.append({
-                            'stat': stat_name,
-                            'per_90': per90_value,
-                            'percentile': int(percentile)
-                        })
-                        print(f"Processed stat: {stat_name}")
-                    except Exception as e:
-                        print(f"Error processing stat row: {e}")
-                        continue
-            else:
-                print("No scouting report div found")
-            
-            player_info['scouting_report'] = scouting_report
-
-            analysis = self.analyzer.analyze_player(player_info)
-            if 'error' not in analysis:
-                player_info.update(analysis)
+            content_hash = self.parser.fingerprint(response.content)
+            self.page_cache.put(response.url, response.content, response.headers, content_hash)
+            if cached and content_hash is not None and content_hash == cached.get('content_hash'):
+                return self._unchanged(response.url)
+
+            return self.build_result(response.url, response.content, analyze)
+
+        except Exception as e:
+            return self._failed(e)
 
+    def reparse_cached(self, url, analyze=True, version=-1):
+        html = self.page_cache.body(url, version)
+        if html is None:
             return {
-                'success': True,
-                'data': player_info
+                'success': False,
+                'error': 'Page not cached'
             }
-            
-        except Exception as e:
-            print(f"Error occurred: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        return self.build_result(url, html, analyze)
+
+    def build_result(self, url, html, analyze=True):
+        if parse_pool.enabled:
+            player_info, timings = parse_pool.parse(html, analyze)
+        else:
+            player_info, timings = parse_page(self.parser, self.analyzer, html, analyze)
+        for stage, seconds in timings.items():
+            lookup_stage_seconds.labels(stage).observe(seconds)
+
+        if player_info is None:
+            parse_failures.labels('meta').inc()
             return {
                 'success': False,
-                'error': str(e)
-            }
\ No newline at end of file
+                'error': 'Could not find player info'
+            }
+
+        player_id_match = re.search(r'/players/([0-9a-f]+)/', url)
+
+        return {
+            'success': True,
+            'data': player_info,
+            'fbref_id': player_id_match.group(1) if player_id_match else None,
+            'url': url
+        }
+
+    def _failed(self, error):
+        if isinstance(error, (UpstreamBusyError, UpstreamUnavailableError)):
+            logger.warning(f"fbref request not made: {str(error)}")
+        elif isinstance(error, ParsePoolBusy):
+            logger.warning(f"Page not parsed: {str(error)}")
+        elif isinstance(error, requests.RequestException):
+            logger.warning(f"fbref request failed: {str(error)}")
+        else:
+            logger.exception(f"Error scraping player: {str(error)}")
+        return {
+            'success': False,
+            'error': str(error)
+        }
+
+    def _unchanged(self, url):
+        player_id_match = re.search(r'/players/([0-9a-f]+)/', url)
+        return {
+            'success': True,
+            'unchanged': True,
+            'fbref_id': player_id_match.group(1) if player_id_match else None,
+            'url': url
+        }
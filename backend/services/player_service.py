@@ -0,0 +1,412 @@
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from config import Config
+from database import db
+from models.player import RESPONSE_FIELDS, Player
+from models.player_alias import PlayerAlias
+from services import fast_json
+from services.freshness import FreshnessPolicy
+from services.name_normalizer import normalize_name
+from services.player_scraper import PlayerScraper
+from services.player_suggester import player_suggester
+from services.refresh_worker import RefreshWorker
+from services.response_cache import response_cache
+from services.metrics import searches, timed
+from services.scrape_jobs import JobQueueFull, scrape_jobs
+from services.similarity_index import similarity_index
+from services.stat_history import stat_history
+from services.single_flight import SingleFlight, advisory_lock
+
+class PlayerService:
+    def __init__(self, scraper=None, batch_workers=None):
+        self.scraper = scraper or PlayerScraper()
+        self.batch_workers = batch_workers or Config.BATCH_SCRAPE_WORKERS
+        self.single_flight = SingleFlight()
+        self.freshness = FreshnessPolicy()
+        self.refresh_worker = RefreshWorker(self.scraper)
+
+    def build_player(self, name, result):
+        data = result['data']
+        player = Player(
+            name=name,
+            fbref_id=result.get('fbref_id'),
+            fbref_url=result.get('url'),
+            general_info=data['general_info'],
+            player_overview=data.get('player_overview')
+        )
+        player.set_stats(data.get('current_season_stats'), data.get('scouting_report'))
+        if data.get('analysis_version'):
+            player.mark_analyzed(data['analysis_version'])
+        return player
+
+    def find_cached(self, name):
+        alias = db.session.get(PlayerAlias, normalize_name(name))
+        if alias:
+            return alias.player
+
+        # Rows stored before aliases existed are only reachable by their name.
+        player = Player.query.filter_by(name=name).first()
+        if player:
+            added = self._add_aliases([(player, name)])
+            db.session.commit()
+            player_suggester.publish_aliases(added)
+        return player
+
+    def parse_fields(self, value):
+        if not value:
+            return None
+        fields = {field.strip() for field in value.split(',') if field.strip()}
+        unknown = fields - set(RESPONSE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(field for field in RESPONSE_FIELDS if field in fields)
+
+    def cached_response(self, name, fields=None):
+        # (body, etag, seconds the body stays fresh) for a stored player, or
+        # None when the player still has to be scraped.
+        key = normalize_name(name)
+        cache_key = key if fields is None else f"{key}?fields={','.join(fields)}"
+        with timed('cache_lookup'):
+            entry = response_cache.lookup(cache_key)
+        if entry is not None:
+            searches.labels('response_cache').inc()
+            body, (etag, stale_at) = entry
+            return body, etag, max(0, stale_at - time.monotonic())
+
+        with timed('db_lookup'):
+            player = self.find_cached(name)
+        if not player:
+            return None
+
+        etag = self.etag(player, fields)
+        if self.freshness.stale_groups(player):
+            searches.labels('database_stale').inc()
+            self.schedule_refresh_if_stale(player)
+            with timed('encode'):
+                return self.player_json(player, fields), etag, 0
+
+        searches.labels('database').inc()
+        ttl = self.freshness.seconds_until_stale(player, 'stats')
+        with timed('encode'):
+            body = self.player_json(player, fields)
+        response_cache.set(cache_key, body, player.id, ttl=ttl, meta=(etag, time.monotonic() + ttl))
+        return body, etag, ttl
+
+    def etag(self, player, fields=None):
+        # Changes with every write to the row; the field list is part of it
+        # because each selection is a different body.
+        version = int(player.updated_at.timestamp() * 1000) if player.updated_at else 0
+        etag = f"p{player.id}-{version:x}"
+        if fields is not None:
+            etag += f"-{zlib.crc32(','.join(fields).encode('utf-8')):x}"
+        return etag
+
+    def player_json(self, player, fields=None):
+        if fields is not None:
+            return self.encode(player.to_dict(fields))
+        if player.response_json is not None:
+            return player.response_json
+
+        body = self.encode(player.to_dict())
+        # Written around the ORM so updated_at keeps its value, and only if
+        # the row has not changed since it was read.
+        db.session.query(Player).filter(
+            Player.id == player.id,
+            Player.updated_at == player.updated_at
+        ).update({Player.response_json: body, Player.updated_at: player.updated_at}, synchronize_session=False)
+        db.session.commit()
+        return body
+
+    def submit_scrape(self, name):
+        # Players we have never stored are scraped off the request thread;
+        # the caller gets a job id to poll or stream the result from.
+        try:
+            job_id = scrape_jobs.submit(current_app._get_current_object(), name, normalize_name(name), self._scrape_and_store)
+        except JobQueueFull:
+            searches.labels('rejected').inc()
+            raise
+        searches.labels('scrape_job').inc()
+        return job_id
+
+    def encode(self, payload):
+        return fast_json.dumps(payload)
+
+    def schedule_refresh_if_stale(self, player):
+        if not Config.REFRESH_ENABLED:
+            return False
+        # While fbref is failing the stored row is served as is; queueing
+        # refreshes would only pile up requests for the breaker to reject.
+        if self.scraper.client.breaker.state() == 'open':
+            return False
+
+        stale_groups = self.freshness.stale_groups(player)
+        if not stale_groups:
+            return False
+        return self.refresh_worker.schedule(current_app._get_current_object(), player.id, stale_groups)
+
+    def upstream_stats(self):
+        return {
+            **self.scraper.client.stats(),
+            'refresh_pending': self.refresh_worker.pending(),
+            'scrape_jobs_active': scrape_jobs.active()
+        }
+
+    def _scrape_and_store(self, name, key):
+        if Config.SINGLE_FLIGHT_MODE != 'postgres':
+            return self._store_scraped(name, self.scraper.search_player(name))
+
+        with advisory_lock(db.engine, f"player:{key}"):
+            # Another worker may have stored the player while we waited.
+            player = self.find_cached(name)
+            if player:
+                return player.to_dict()
+            return self._store_scraped(name, self.scraper.search_player(name))
+
+    def _store_scraped(self, name, result):
+        if not result['success']:
+            return result
+
+        try:
+            with timed('commit'):
+                player = self._save_scraped(name, result)
+        except IntegrityError:
+            db.session.rollback()
+            player = self._find_stored(name, result)
+            if player:
+                added = self._add_aliases([(player, name)])
+                db.session.commit()
+                player_suggester.publish_aliases(added)
+            else:
+                # Another player took the name meanwhile; saving again gives
+                # this one a disambiguated name.
+                player = self._save_scraped(name, result)
+
+        return player.to_dict()
+
+    def _find_stored(self, name, result):
+        fbref_id = result.get('fbref_id')
+        if fbref_id:
+            player = Player.query.filter_by(fbref_id=fbref_id).first()
+            if player:
+                return player
+        # Rows stored without an fbref id are only reachable by name, but a
+        # name match that belongs to another fbref player is a namesake.
+        player = Player.query.filter_by(name=name).first()
+        if player and player.fbref_id and player.fbref_id != fbref_id:
+            return None
+        return player
+
+    def _assign_unique_names(self, players):
+        # Player.name is unique but display names are not: the first "Danilo"
+        # stored keeps the name, later namesakes get their fbref id appended.
+        taken = {
+            name for (name,) in
+            db.session.query(Player.name).filter(Player.name.in_({player.name for player in players})).all()
+        }
+        for player in players:
+            if player.name in taken:
+                suffix = f" ({player.fbref_id or uuid.uuid4().hex[:8]})"
+                player.name = f"{player.name[:100 - len(suffix)]}{suffix}"
+            taken.add(player.name)
+
+    def _save_scraped(self, name, result):
+        player = self._find_stored(name, result)
+        if player is None:
+            player = self.build_player(name, result)
+            self._assign_unique_names([player])
+            db.session.add(player)
+            db.session.flush()
+            stat_history.record([player])
+
+        added = self._add_aliases([(player, name), (player, player.general_info.get('name'))])
+        db.session.commit()
+        response_cache.invalidate_player(player.id)
+        player_suggester.publish_aliases(added)
+        similarity_index.update([player])
+        return player
+
+    def _add_aliases(self, pairs):
+        claims = {}
+        for player, name in pairs:
+            key = normalize_name(name)
+            if key:
+                claims.setdefault(key, player)
+        if not claims:
+            return []
+
+        existing = {
+            alias for (alias,) in
+            db.session.query(PlayerAlias.alias).filter(PlayerAlias.alias.in_(list(claims))).all()
+        }
+        added = []
+        for key, player in claims.items():
+            if key not in existing:
+                db.session.add(PlayerAlias(alias=key, player_id=player.id))
+                response_cache.invalidate(key)
+                player_suggester.add_alias(key, player.id)
+                added.append(player.id)
+        return added
+
+    def search_many(self, names):
+        names = list(dict.fromkeys(names))
+        keys = {name: normalize_name(name) for name in names}
+
+        cached = {
+            alias.alias: alias.player
+            for alias in PlayerAlias.query.options(
+                selectinload(PlayerAlias.player).selectinload(Player.season_stats),
+                selectinload(PlayerAlias.player).selectinload(Player.scouting_stats)
+            ).filter(PlayerAlias.alias.in_(set(keys.values()))).all()
+        }
+        unresolved = [name for name in names if keys[name] not in cached]
+        if unresolved:
+            legacy = Player.query.options(
+                selectinload(Player.season_stats),
+                selectinload(Player.scouting_stats)
+            ).filter(Player.name.in_(unresolved)).all()
+            for player in legacy:
+                cached[keys[player.name]] = player
+            if legacy:
+                added = self._add_aliases([(player, player.name) for player in legacy])
+                db.session.commit()
+                player_suggester.publish_aliases(added)
+
+        misses = [name for name in names if keys[name] not in cached]
+
+        scraped = {}
+        stored = {}
+        if misses and Config.SINGLE_FLIGHT_MODE == 'postgres':
+            # Each miss is scraped and stored under its own advisory lock, like
+            # a single search, so workers never fetch the same player twice.
+            app = current_app._get_current_object()
+            with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(misses))) as pool:
+                scraped = dict(zip(misses, pool.map(lambda name: self._scrape_and_store_in(app, name), misses)))
+        elif misses:
+            with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(misses))) as pool:
+                scraped = dict(zip(misses, pool.map(self._scrape, misses)))
+            stored = self.save_all({name: (name, result) for name, result in scraped.items() if result['success']})
+
+        results = []
+        for name in names:
+            player = cached.get(keys[name])
+            if player:
+                self.schedule_refresh_if_stale(player)
+                results.append({'name': name, 'source': 'cache', **player.to_dict()})
+            elif name in stored:
+                results.append({'name': name, 'source': 'fbref', **stored[name].to_dict()})
+            else:
+                results.append({'name': name, 'source': 'fbref', **scraped[name]})
+        return results
+
+    def _scrape(self, name):
+        try:
+            return self.single_flight.do(('scrape', normalize_name(name)), lambda: self.scraper.search_player(name))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def _scrape_and_store_in(self, app, name):
+        key = normalize_name(name)
+        try:
+            with app.app_context():
+                return self.single_flight.do(('store', key), lambda: self._scrape_and_store(name, key))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def save_all(self, results):
+        # results maps a caller's key to (name, scrape result), and the stored
+        # players come back under the same keys. Players are matched on fbref
+        # id, so namesakes in one batch stay separate rows.
+        if not results:
+            return {}
+
+        fbref_ids = {result['fbref_id'] for _, result in results.values() if result.get('fbref_id')}
+        by_fbref_id = {
+            player.fbref_id: player
+            for player in Player.query.filter(Player.fbref_id.in_(fbref_ids)).all()
+        } if fbref_ids else {}
+
+        try:
+            stored = {}
+            names = []
+            new_players = []
+            for key, (name, result) in results.items():
+                player = by_fbref_id.get(result.get('fbref_id'))
+                if player is None:
+                    player = self.build_player(name, result)
+                    new_players.append(player)
+                    if result.get('fbref_id'):
+                        by_fbref_id[result['fbref_id']] = player
+                stored[key] = player
+                names.append((player, name))
+
+            with timed('commit'):
+                self._assign_unique_names(new_players)
+                db.session.add_all(new_players)
+                db.session.flush()
+                stat_history.record(new_players)
+
+                added = self._add_aliases(
+                    names + [(player, player.general_info.get('name')) for player in stored.values()]
+                )
+                db.session.commit()
+                player_suggester.publish_aliases(added)
+        except IntegrityError:
+            # Another request stored some of these players while we were
+            # scraping; keep whichever rows still fit instead of dropping the
+            # whole batch.
+            db.session.rollback()
+            stored = {}
+            for key, (name, result) in results.items():
+                try:
+                    stored[key] = self._save_scraped(name, result)
+                except IntegrityError:
+                    db.session.rollback()
+
+        response_cache.invalidate_players(player.id for player in stored.values())
+        similarity_index.update(list(stored.values()))
+        return stored
+
+    def upsert_season_stats(self, competition, rows):
+        # Writes one competition's season stats, as listed on a competition or
+        # squad stats page, for every listed player we already store, in one
+        # transaction. stats_updated_at is left alone: the scouting report
+        # and overview have not been refreshed. Players we do not store yet
+        # come back as 'missing' for a profile fetch.
+        rows_by_id = {row['fbref_id']: row for row in rows}
+        fbref_ids = list(rows_by_id)
+        stored = {}
+        for start in range(0, len(fbref_ids), 500):
+            for player in Player.query.options(
+                selectinload(Player.season_stats), selectinload(Player.scouting_stats)
+            ).filter(
+                Player.fbref_id.in_(fbref_ids[start:start + 500])
+            ):
+                stored[player.fbref_id] = player
+
+        updated = []
+        now = datetime.utcnow()
+        with timed('commit'):
+            for fbref_id, player in stored.items():
+                values = rows_by_id[fbref_id].get('season_stats')
+                if values and player.merge_season_stats(competition, values):
+                    player.updated_at = now
+                    player.response_json = None
+                    updated.append(player)
+            stat_history.record(updated, now)
+            db.session.commit()
+
+        response_cache.invalidate_players(player.id for player in updated)
+        return {
+            'listed': len(rows_by_id),
+            'updated': len(updated),
+            'unchanged': len(stored) - len(updated),
+            'missing': [row for fbref_id, row in rows_by_id.items() if fbref_id not in stored]
+        }
@@ -0,0 +1,137 @@
+import threading
+
+from sqlalchemy import or_, text
+
+from config import Config
+from database import db
+from models.player import Player
+from models.player_alias import PlayerAlias
+from services.name_normalizer import normalize_name
+from services.prefix_index import PrefixIndex, rank_matches
+from services.response_cache import InvalidationLog
+
+TRIGRAM_QUERY = text("""
+    SELECT player_id,
+           max(similarity(alias, :query)) AS score,
+           bool_or(alias = :query) AS exact,
+           bool_or(alias LIKE :prefix OR alias LIKE :word_prefix) AS prefix
+    FROM player_aliases
+    WHERE alias % :query OR alias LIKE :prefix OR alias LIKE :word_prefix
+    GROUP BY player_id
+    ORDER BY exact DESC, prefix DESC, score DESC, player_id
+    LIMIT :limit OFFSET :offset
+""")
+
+PREFIX_SCORES = {0: 1.0, 1: 0.9, 2: 0.75}
+
+class PlayerSuggester:
+    # Without pg_trgm (SQLite, local development) suggestions are prefix
+    # matches only, with no typo tolerance, served from a trie each worker
+    # builds from player_aliases. Aliases stored through other workers on the
+    # host reach it through the alias log.
+    def __init__(self, alias_log=None):
+        self.prefix_index = None
+        self.alias_log = alias_log or InvalidationLog(Config.SUGGEST_ALIAS_LOG_FILE)
+        self._lock = threading.Lock()
+
+    def uses_trigram_index(self):
+        return db.engine.dialect.name == 'postgresql'
+
+    def suggest(self, query, limit=None, offset=0):
+        query = normalize_name(query)
+        limit = max(1, min(limit or Config.SUGGEST_DEFAULT_LIMIT, Config.SUGGEST_MAX_LIMIT))
+        offset = max(0, min(offset, Config.SUGGEST_MAX_OFFSET))
+
+        if len(query) < Config.SUGGEST_MIN_QUERY_LENGTH:
+            return [], False
+
+        # One extra row tells us whether another page exists.
+        if self.uses_trigram_index():
+            matches = self._trigram_matches(query, limit + 1, offset)
+        else:
+            matches = self._prefix_matches(query, limit + 1, offset)
+
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+
+        players = {
+            player.id: player
+            for player in Player.query.filter(Player.id.in_([player_id for player_id, _ in matches])).all()
+        } if matches else {}
+
+        suggestions = []
+        for player_id, score in matches:
+            player = players.get(player_id)
+            if player is None:
+                continue
+            general_info = player.general_info or {}
+            suggestions.append({
+                'id': player.id,
+                'name': general_info.get('name') or player.name,
+                'position': general_info.get('position'),
+                'club': general_info.get('club'),
+                'photo_url': general_info.get('photo_url'),
+                'score': round(float(score), 3)
+            })
+        return suggestions, has_more
+
+    def _trigram_matches(self, query, limit, offset):
+        pattern = self._like_pattern(query)
+        rows = db.session.execute(TRIGRAM_QUERY, {
+            'query': query,
+            'prefix': f'{pattern}%',
+            'word_prefix': f'% {pattern}%',
+            'limit': limit,
+            'offset': offset
+        })
+        return [(row.player_id, row.score) for row in rows]
+
+    def _prefix_matches(self, query, limit, offset):
+        matches = self._get_prefix_index().search(query, limit + offset)
+        if matches is None:
+            matches = self._like_matches(query, limit + offset)
+        return [(player_id, PREFIX_SCORES[rank[0]]) for player_id, rank in matches[offset:]]
+
+    def _like_matches(self, query, limit):
+        # For prefixes so common that the trie node kept too few players:
+        # the same matching and ranking, over the whole alias table.
+        pattern = self._like_pattern(query)
+        rows = db.session.query(PlayerAlias.alias, PlayerAlias.player_id).filter(or_(
+            PlayerAlias.alias.like(f'{pattern}%', escape='\\'),
+            PlayerAlias.alias.like(f'% {pattern}%', escape='\\')
+        ))
+        return rank_matches(rows, query, limit)
+
+    def _like_pattern(self, query):
+        return query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _get_prefix_index(self):
+        with self._lock:
+            # Read before a first build so nothing committed during it is missed.
+            reset, player_ids = self.alias_log.read()
+            if reset:
+                self.prefix_index = None
+
+            if self.prefix_index is None:
+                index = PrefixIndex()
+                for alias, player_id in db.session.query(PlayerAlias.alias, PlayerAlias.player_id).yield_per(1000):
+                    index.add(alias, player_id)
+                self.prefix_index = index
+            elif player_ids:
+                rows = db.session.query(PlayerAlias.alias, PlayerAlias.player_id).filter(
+                    PlayerAlias.player_id.in_(set(player_ids))
+                )
+                for alias, player_id in rows:
+                    self.prefix_index.add(alias, player_id)
+            return self.prefix_index
+
+    def add_alias(self, alias, player_id):
+        if self.prefix_index is not None:
+            self.prefix_index.add(alias, player_id)
+
+    def publish_aliases(self, player_ids):
+        # After the aliases are committed, so other workers can load them.
+        if player_ids and not self.uses_trigram_index():
+            self.alias_log.publish(set(player_ids))
+
+player_suggester = PlayerSuggester()
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+from database import db
+from models.player import Player
+from models.player_alias import PlayerAlias
+from services.name_normalizer import normalize_name
+
+logger = logging.getLogger(__name__)
+
+class PlayerWarmer:
+    def __init__(self, player_service, concurrency=None, batch_size=None, checkpoint_path=None):
+        self.player_service = player_service
+        self.scraper = player_service.scraper
+        self.concurrency = concurrency or Config.WARM_CONCURRENCY
+        self.batch_size = batch_size or Config.WARM_BATCH_SIZE
+        self.checkpoint_path = checkpoint_path
+
+    def checkpoint_for(self, source):
+        return self.checkpoint_path or os.path.join(
+            Config.WARM_CHECKPOINT_DIR, f"{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}.json"
+        )
+
+    def run(self, items, source, progress=None):
+        # items are {'name': ...} to search for, or {'name', 'url', 'fbref_id'}
+        # when the player page is already known.
+        progress = progress or (lambda stats: None)
+        checkpoint_path = self.checkpoint_for(source)
+        checkpoint = self._load_checkpoint(checkpoint_path, source)
+
+        items = list({self._key(item): item for item in items}.values())
+        stats = {'total': len(items), 'resumed': 0, 'skipped': 0, 'stored': 0, 'failed': 0, 'elapsed': 0.0}
+        pending = [item for item in items if self._key(item) not in checkpoint['done']]
+        stats['resumed'] = len(items) - len(pending)
+
+        stored = self._already_stored(pending)
+        checkpoint['done'].update(stored)
+        stats['skipped'] = len(stored)
+        pending = [item for item in pending if self._key(item) not in stored]
+        self._save_checkpoint(checkpoint_path, checkpoint)
+
+        started = time.monotonic()
+        batch = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='warm') as pool:
+            # Only a few scrapes are queued ahead of the workers, so a long
+            # list is streamed rather than submitted all at once.
+            remaining = iter(pending)
+            in_flight = set()
+            while True:
+                while len(in_flight) < self.concurrency * 2:
+                    item = next(remaining, None)
+                    if item is None:
+                        break
+                    in_flight.add(pool.submit(self._scrape, item))
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                batch.extend(future.result() for future in finished)
+                if len(batch) >= self.batch_size or (not in_flight and batch):
+                    self._store(batch, checkpoint, stats)
+                    self._save_checkpoint(checkpoint_path, checkpoint)
+                    batch = []
+                    stats['elapsed'] = time.monotonic() - started
+                    progress(stats)
+
+        stats['elapsed'] = time.monotonic() - started
+        stats['checkpoint'] = checkpoint_path
+        stats['failures'] = dict(checkpoint['failed'])
+        return stats
+
+    def _scrape(self, item):
+        if item.get('url'):
+            return item, self.scraper.fetch_player(item['url'])
+        return item, self.scraper.search_player(item['name'])
+
+    def _store(self, batch, checkpoint, stats):
+        succeeded = {self._key(item): (item['name'], result) for item, result in batch if result['success']}
+        saved = self.player_service.save_all(succeeded)
+
+        for item, result in batch:
+            key = self._key(item)
+            if key in saved:
+                checkpoint['done'].add(key)
+                checkpoint['failed'].pop(key, None)
+                stats['stored'] += 1
+            else:
+                # Left out of 'done', so the next run tries these again.
+                checkpoint['failed'][key] = result.get('error') or 'Could not store player'
+                stats['failed'] += 1
+        db.session.expunge_all()
+
+    def _already_stored(self, items):
+        stored = set()
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            fbref_ids = {item['fbref_id']: self._key(item) for item in chunk if item.get('fbref_id')}
+            aliases = {normalize_name(item['name']): self._key(item) for item in chunk if not item.get('fbref_id')}
+
+            if fbref_ids:
+                for (fbref_id,) in db.session.query(Player.fbref_id).filter(Player.fbref_id.in_(list(fbref_ids))):
+                    stored.add(fbref_ids[fbref_id])
+            if aliases:
+                for (alias,) in db.session.query(PlayerAlias.alias).filter(PlayerAlias.alias.in_(list(aliases))):
+                    stored.add(aliases[alias])
+        return stored
+
+    def _key(self, item):
+        return item.get('fbref_id') or normalize_name(item['name'])
+
+    def _load_checkpoint(self, path, source):
+        try:
+            with open(path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            checkpoint = None
+
+        if not checkpoint or checkpoint.get('source') != source:
+            return {'source': source, 'done': set(), 'failed': {}}
+        return {'source': source, 'done': set(checkpoint['done']), 'failed': checkpoint.get('failed', {})}
+
+    def _save_checkpoint(self, path, checkpoint):
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({**checkpoint, 'done': sorted(checkpoint['done'])}, f)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error(f"Error writing warm checkpoint {path}: {str(e)}")
@@ -0,0 +1,80 @@
+import bisect
+import threading
+
+class _Node:
+    __slots__ = ('children', 'entries', 'saturated')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+        self.saturated = False
+
+def match_rank(alias, prefix):
+    return (0 if alias == prefix else 1 if alias.startswith(prefix) else 2, len(alias), alias)
+
+def rank_matches(entries, prefix, limit):
+    # (player_id, rank) for the best alias of each player, best first.
+    best = {}
+    for alias, player_id in entries:
+        rank = match_rank(alias, prefix)
+        if player_id not in best or rank < best[player_id]:
+            best[player_id] = rank
+
+    ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))
+    return ranked[:limit]
+
+class PrefixIndex:
+    def __init__(self, max_entries_per_node=64):
+        self.max_entries_per_node = max_entries_per_node
+        self._root = _Node()
+        self._lock = threading.Lock()
+        self._aliases = set()
+
+    def __len__(self):
+        return len(self._aliases)
+
+    def add(self, alias, player_id):
+        # Every word start is indexed, so "mba" finds "kylian mbappe".
+        with self._lock:
+            if alias in self._aliases:
+                return
+            self._aliases.add(alias)
+
+            words = alias.split(' ')
+            for i in range(len(words)):
+                # Whole-alias keys before word starts, then shorter aliases:
+                # for the prefix a node stands for, that is the order search
+                # ranks them in, so a full node keeps its best matches and an
+                # exact match is never the entry dropped.
+                self._insert(' '.join(words[i:]), (i > 0, len(alias), alias, player_id))
+
+    def _insert(self, key, entry):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+            if len(node.entries) < self.max_entries_per_node:
+                bisect.insort(node.entries, entry)
+            elif entry < node.entries[-1]:
+                bisect.insort(node.entries, entry)
+                node.entries.pop()
+                node.saturated = True
+            else:
+                node.saturated = True
+
+    def search(self, prefix, limit):
+        # None when the node for the prefix dropped entries and the ones it
+        # kept cover fewer than limit players; the caller has to look the
+        # prefix up elsewhere.
+        with self._lock:
+            node = self._root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            entries = [(alias, player_id) for _, _, alias, player_id in node.entries]
+            saturated = node.saturated
+
+        ranked = rank_matches(entries, prefix, limit)
+        if saturated and len(ranked) < limit:
+            return None
+        return ranked
@@ -0,0 +1,98 @@
+import fcntl
+import json
+import os
+import threading
+import time
+
+class RateLimitTimeout(Exception):
+    pass
+
+class FileTokenBucket:
+    # Token bucket whose state lives in a small file guarded by flock, so
+    # every worker process on the host draws from the same budget. It is kept
+    # in its "theoretical arrival time" form: each caller reserves the next
+    # free slot under the lock and then sleeps until it, which keeps callers
+    # in order without polling.
+    def __init__(self, path, rate_per_second, burst, max_wait):
+        self.path = path
+        self.interval = 1.0 / rate_per_second
+        self.burst = max(1, burst)
+        self.max_wait = max_wait
+
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._state() as state:
+            now = time.time()
+            tolerance = self.interval * (self.burst - 1)
+            arrival = max(state.get('tat', 0.0), now)
+            start = arrival - tolerance
+            wait = max(0.0, start - now)
+            if wait > self.max_wait:
+                raise RateLimitTimeout(f'fbref rate limit reached, next request slot in {wait:.0f}s')
+            state['tat'] = arrival + self.interval
+
+        if wait > 0:
+            with self._lock:
+                self._waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        return wait
+
+    def pause(self, seconds):
+        # fbref asked us to back off; no worker gets a slot before then.
+        with self._state() as state:
+            state['tat'] = max(state.get('tat', 0.0), time.time() + seconds + self.interval * (self.burst - 1))
+
+    def waiting(self):
+        with self._lock:
+            return self._waiting
+
+    def stats(self):
+        with self._state() as state:
+            tat = state.get('tat', 0.0)
+        now = time.time()
+        available = (now + self.interval * self.burst - max(tat, now)) / self.interval
+        return {
+            'rate_per_minute': round(60 / self.interval, 2),
+            'burst': self.burst,
+            'tokens_available': max(0, min(self.burst, int(available))),
+            'waiting': self.waiting()
+        }
+
+    def _state(self):
+        return LockedState(self.path)
+
+class LockedState:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.state = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a+')
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        self.file.seek(0)
+        try:
+            self.state = json.loads(self.file.read() or '{}')
+        except ValueError:
+            self.state = {}
+        self._original = dict(self.state)
+        return self.state
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None and self.state != self._original:
+                self.file.seek(0)
+                self.file.truncate()
+                self.file.write(json.dumps(self.state))
+                self.file.flush()
+        finally:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        return False
@@ -0,0 +1,129 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from database import db
+from models.player import Player
+from services.response_cache import response_cache
+from services.similarity_index import similarity_index
+from services.stat_history import stat_history
+
+logger = logging.getLogger(__name__)
+
+class RefreshWorker:
+    def __init__(self, scraper, min_interval=None, queue_size=None):
+        self.scraper = scraper
+        self.min_interval = min_interval if min_interval is not None else Config.REFRESH_MIN_INTERVAL_SECONDS
+        self.queue = queue.Queue(maxsize=queue_size or Config.REFRESH_QUEUE_SIZE)
+        self.app = None
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_fetch = 0.0
+
+    def schedule(self, app, player_id, groups):
+        with self._lock:
+            if player_id in self._pending:
+                self._pending[player_id].update(groups)
+                return True
+
+            try:
+                self.queue.put_nowait(player_id)
+            except queue.Full:
+                return False
+
+            self._pending[player_id] = set(groups)
+            self.app = app
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='player-refresh', daemon=True)
+                self._thread.start()
+            return True
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            player_id = self.queue.get()
+            with self._lock:
+                groups = self._pending.pop(player_id, set())
+
+            wait = max(
+                self._last_fetch + self.min_interval - time.monotonic(),
+                self.scraper.client.breaker.seconds_until_retry()
+            )
+            if wait > 0:
+                time.sleep(wait)
+            self._last_fetch = time.monotonic()
+
+            try:
+                with self.app.app_context():
+                    self.refresh(player_id, groups)
+            except Exception as e:
+                logger.error(f"Error refreshing player {player_id}: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def refresh(self, player_id, groups):
+        player = db.session.get(Player, player_id)
+        if not player:
+            return False
+
+        if player.fbref_url:
+            result = self.scraper.refresh_player(player.fbref_url, analyze=False)
+        else:
+            result = self.scraper.search_player(player.name, analyze=False)
+        if not result['success']:
+            logger.warning(f"Refresh of {player.name} failed: {result.get('error')}")
+            return False
+
+        now = datetime.utcnow()
+        if result.get('unchanged'):
+            # Only the stamps move. Written around the ORM with updated_at
+            # passed through, so the ETag and the stored response body stay
+            # valid.
+            stamps = {'id': player.id, 'updated_at': player.updated_at}
+            if 'info' in groups:
+                stamps['info_updated_at'] = now
+            if 'stats' in groups:
+                stamps['stats_updated_at'] = now
+            db.session.bulk_update_mappings(Player, [stamps])
+            db.session.commit()
+            response_cache.invalidate_player(player.id)
+            return True
+
+        data = result['data']
+
+        if 'info' in groups:
+            player.general_info = data['general_info']
+            player.info_updated_at = now
+
+        if 'stats' in groups:
+            player.set_stats(data.get('current_season_stats'), data.get('scouting_report'))
+            player.stats_updated_at = now
+
+        # Scoring is pure CPU work on the report and a few profile fields, so
+        # it only needs to run again when one of those, or the analyzer
+        # config, actually changed.
+        analyzer = self.scraper.analyzer
+        if (player.analysis_version != analyzer.version
+                or player.analysis_input_hash != player.analysis_inputs_hash()):
+            analysis = analyzer.analyze_player({
+                'general_info': player.general_info,
+                'scouting_report': player.scouting_report_list()
+            })
+            if 'error' not in analysis:
+                player.player_overview = analysis['player_overview']
+            player.mark_analyzed(analyzer.version)
+
+        stat_history.record([player], now)
+        db.session.commit()
+        response_cache.invalidate_player(player.id)
+        similarity_index.update([player])
+        return True
+
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
+
+from config import Config
+from database import db
+from models.player import Player
+from services.metrics import players_rescored
+from services.player_analyzer import analyzers
+from services.response_cache import response_cache
+from services.single_flight import try_advisory_lock
+from services.stat_history import stat_history
+
+logger = logging.getLogger(__name__)
+
+class Rescorer:
+    # Recomputes player_overview for rows analyzed with another analyzer
+    # version, from the stored scouting report and profile; nothing is
+    # fetched. Under gunicorn every worker runs the loop, and on Postgres an
+    # advisory lock lets one of them work at a time.
+    def __init__(self, analyzer_source=None, batch_size=None):
+        self.analyzer_source = analyzer_source or analyzers
+        self.batch_size = batch_size or Config.RESCORE_BATCH_SIZE
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, app):
+        if not Config.RESCORE_ENABLED:
+            return False
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self.app = app
+            self._thread = threading.Thread(target=self._run, name='player-rescore', daemon=True)
+            self._thread.start()
+            return True
+
+    def pending(self, version=None):
+        version = version or self.analyzer_source.current().version
+        return Player.query.filter(self._stale(version)).count()
+
+    def rescore_all(self, progress=None, pause=0.0):
+        # One pass over the stale rows with the analyzer current at the start;
+        # rows a config change makes stale mid-pass are left for the next one.
+        analyzer = self.analyzer_source.current()
+        stats = {'version': analyzer.version, 'rescored': 0, 'changed': 0}
+        last_id = 0
+        while True:
+            rescored, changed, last_id = self.rescore_batch(analyzer, last_id)
+            if not rescored:
+                return stats
+            stats['rescored'] += rescored
+            stats['changed'] += changed
+            if progress:
+                progress(stats)
+            if pause:
+                time.sleep(pause)
+
+    def rescore_batch(self, analyzer, after_id=0):
+        players = Player.query.options(selectinload(Player.scouting_stats)).filter(
+            Player.id > after_id,
+            self._stale(analyzer.version)
+        ).order_by(Player.id).limit(self.batch_size).all()
+        if not players:
+            return 0, 0, after_id
+
+        reports = [
+            {'general_info': player.general_info, 'scouting_report': player.scouting_report_list()}
+            for player in players
+        ]
+        changed = []
+        unchanged = []
+        for player, analysis in zip(players, analyzer.analyze_many(reports)):
+            if 'error' not in analysis and analysis['player_overview'] != player.player_overview:
+                player.player_overview = analysis['player_overview']
+                player.mark_analyzed(analyzer.version)
+                changed.append(player)
+            else:
+                # Same overview: only the stamps move, and updated_at is
+                # written back as is so cached bodies and ETags stay valid.
+                unchanged.append({
+                    'id': player.id,
+                    'analysis_version': analyzer.version,
+                    'analysis_input_hash': player.analysis_inputs_hash(),
+                    'updated_at': player.updated_at
+                })
+
+        if unchanged:
+            db.session.bulk_update_mappings(Player, unchanged)
+        stat_history.record(changed)
+        db.session.commit()
+
+        response_cache.invalidate_players(player.id for player in changed)
+        players_rescored.labels('changed').inc(len(changed))
+        players_rescored.labels('unchanged').inc(len(unchanged))
+        last_id = players[-1].id
+        db.session.expunge_all()
+        return len(players), len(changed), last_id
+
+    def _stale(self, version):
+        return or_(Player.analysis_version.is_(None), Player.analysis_version != version)
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    with try_advisory_lock(db.engine, 'player-rescore') as acquired:
+                        if acquired:
+                            stats = self.rescore_all(pause=Config.RESCORE_BATCH_PAUSE_SECONDS)
+                            if stats['rescored']:
+                                logger.info(
+                                    f"Re-scored {stats['rescored']} players for analyzer version "
+                                    f"{stats['version']}, {stats['changed']} changed"
+                                )
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Error re-scoring players: {str(e)}")
+            time.sleep(Config.RESCORE_INTERVAL_SECONDS)
+
+rescorer = Rescorer()
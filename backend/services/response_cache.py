@@ -0,0 +1,195 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from services.metrics import response_cache_lookups
+
+logger = logging.getLogger(__name__)
+
+class InvalidationLog:
+    # Ids of players whose cached bodies are out of date, appended by the
+    # process that wrote the row and read by every worker on the host on its
+    # next lookup: one stat() per lookup, no database query. Once past
+    # max_bytes the file is replaced by an empty one; a worker that sees the
+    # replacement drops its whole cache, since it cannot tell what it missed.
+    def __init__(self, path, max_bytes=256 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inode = None
+        self._offset = 0
+
+    def publish(self, player_ids):
+        lines = ''.join(f"{player_id}\n" for player_id in player_ids).encode('ascii')
+        if not lines:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                        with open(f"{self.path}.new", 'wb'):
+                            pass
+                        os.replace(f"{self.path}.new", self.path)
+                    with open(self.path, 'ab') as f:
+                        f.write(lines)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.error(f"Error publishing response cache invalidations: {str(e)}")
+
+    def read(self):
+        # (reset, player ids published since the last call).
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False, []
+
+        with self._lock:
+            reset = False
+            if stat.st_ino != self._inode:
+                # Entries from before this process started are not cached here.
+                reset = self._inode is not None
+                self._offset = 0 if reset else stat.st_size
+                self._inode = stat.st_ino
+            if stat.st_size <= self._offset:
+                return reset, []
+
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read(stat.st_size - self._offset)
+            except OSError:
+                return reset, []
+            # A line still being written is picked up next time.
+            complete = data[:data.rfind(b'\n') + 1]
+            self._offset += len(complete)
+            return reset, [int(line) for line in complete.split()]
+
+class ResponseCache:
+    # Per process. Writes made through other workers on the host reach it
+    # through the invalidation log; on other hosts the TTL bounds how long a
+    # body can be stale.
+    def __init__(self, max_entries=None, max_bytes=None, ttl_seconds=None, invalidation_log=None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.RESPONSE_CACHE_TTL_SECONDS
+        self.invalidation_log = invalidation_log or InvalidationLog(Config.RESPONSE_CACHE_INVALIDATION_FILE)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_player = {}
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        entry = self.lookup(key)
+        return entry[0] if entry else None
+
+    def lookup(self, key):
+        # (value, meta) for a live entry, or None.
+        reset, player_ids = self.invalidation_log.read()
+        with self._lock:
+            if reset:
+                self._clear()
+            for player_id in player_ids:
+                self._invalidate_player(player_id)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                response_cache_lookups.labels('miss').inc()
+                return None
+
+            value, player_id, expires_at, meta = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                response_cache_lookups.labels('expired').inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            response_cache_lookups.labels('hit').inc()
+            return value, meta
+
+    def set(self, key, value, player_id=None, ttl=None, meta=None):
+        ttl = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        if ttl <= 0 or len(value) > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, player_id, time.monotonic() + ttl, meta)
+            self._bytes += len(value)
+            if player_id is not None:
+                self._keys_by_player.setdefault(player_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters['evictions'] += 1
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._counters['invalidations'] += 1
+
+    def invalidate_player(self, player_id):
+        self.invalidate_players([player_id])
+
+    def invalidate_players(self, player_ids):
+        # Here and, through the invalidation log, in every other worker.
+        player_ids = list(player_ids)
+        with self._lock:
+            for player_id in player_ids:
+                self._invalidate_player(player_id)
+        self.invalidation_log.publish(player_ids)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'hit_ratio': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            }
+
+    def _invalidate_player(self, player_id):
+        for key in list(self._keys_by_player.get(player_id, ())):
+            self._remove(key)
+            self._counters['invalidations'] += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._keys_by_player.clear()
+        self._bytes = 0
+
+    def _remove(self, key):
+        value, player_id, _, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+        if player_id is not None:
+            keys = self._keys_by_player.get(player_id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_player[player_id]
+
+response_cache = ResponseCache()
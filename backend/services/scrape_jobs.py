@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from config import Config
+from database import db
+from models.scrape_job import ScrapeJob
+from services.metrics import scrape_jobs_finished, timed
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+class JobQueueFull(Exception):
+    pass
+
+class ScrapeJobQueue:
+    def __init__(self, workers=None, max_pending=None, timeout=None, retention=None):
+        self.workers = workers or Config.SCRAPE_JOB_WORKERS
+        self.max_pending = max_pending or Config.SCRAPE_JOB_MAX_PENDING
+        self.timeout = timeout or Config.SCRAPE_JOB_TIMEOUT_SECONDS
+        self.retention = retention or Config.SCRAPE_JOB_RETENTION_SECONDS
+
+        self._lock = threading.Lock()
+        self._active = {}
+        self._creating = {}
+        self._finished = {}
+        self._executor = None
+
+    def submit(self, app, name, key, handler):
+        # One job per normalized name: a second search for a player already
+        # being scraped, here or in another worker, gets the same job id.
+        # The lock only guards the in-memory maps; a thread that finds the
+        # key being created waits for it outside the lock.
+        while True:
+            with self._lock:
+                job_id = self._active.get(key)
+                if job_id is not None:
+                    return job_id
+                creating = self._creating.get(key)
+                if creating is None:
+                    if len(self._active) + len(self._creating) >= self.max_pending:
+                        raise JobQueueFull('Too many players are being fetched right now, try again later')
+                    creating = self._creating[key] = threading.Event()
+                    break
+            creating.wait()
+
+        try:
+            job = ScrapeJob.query.filter(
+                ScrapeJob.name_key == key,
+                ScrapeJob.status.in_(ACTIVE_STATUSES),
+                ScrapeJob.created_at >= datetime.utcnow() - timedelta(seconds=self.timeout)
+            ).first()
+            if job is not None:
+                return job.id
+
+            ScrapeJob.query.filter(
+                ScrapeJob.created_at < datetime.utcnow() - timedelta(seconds=self.retention)
+            ).delete(synchronize_session=False)
+            job = ScrapeJob(id=uuid.uuid4().hex, name=name, name_key=key)
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+
+            with self._lock:
+                self._active[key] = job_id
+                self._finished[job_id] = threading.Event()
+                if self._executor is None:
+                    # Started on first use rather than at import, so pre-forking
+                    # servers do not fork a parent that already owns threads.
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scrape-job')
+                self._executor.submit(self._run, app, job_id, name, key, handler)
+            return job_id
+        finally:
+            with self._lock:
+                self._creating.pop(key).set()
+
+    def get(self, job_id):
+        job = db.session.get(ScrapeJob, job_id, populate_existing=True)
+        if job is None or job.finished:
+            return job
+
+        # A job whose worker died never finishes on its own. Only still
+        # active jobs are marked, so a worker finishing it meanwhile wins.
+        if job.created_at < datetime.utcnow() - timedelta(seconds=self.timeout):
+            self._transition(job_id, ACTIVE_STATUSES, {
+                'status': 'failed',
+                'error': 'Job timed out',
+                'finished_at': datetime.utcnow()
+            })
+            db.session.commit()
+            job = db.session.get(ScrapeJob, job_id, populate_existing=True)
+        return job
+
+    def wait(self, job_id, timeout):
+        # Wakes as soon as a job run by this worker finishes; jobs owned by
+        # another worker are only seen when the caller reads the table again.
+        with self._lock:
+            finished = self._finished.get(job_id)
+        if finished is None:
+            time.sleep(timeout)
+            return False
+        return finished.wait(timeout)
+
+    def active(self):
+        with self._lock:
+            return len(self._active)
+
+    def _run(self, app, job_id, name, key, handler):
+        try:
+            with app.app_context():
+                started = self._transition(job_id, ('queued',), {
+                    'status': 'running',
+                    'started_at': datetime.utcnow()
+                })
+                db.session.commit()
+                if not started:
+                    # Timed out by get() before a worker thread was free.
+                    return
+
+                try:
+                    with timed('scrape_job'):
+                        outcome = {'status': 'done', 'result': handler(name, key)}
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Scrape job {job_id} for {name} failed: {str(e)}")
+                    outcome = {'status': 'failed', 'error': str(e)}
+                outcome['finished_at'] = datetime.utcnow()
+
+                # A job get() already failed for timing out keeps that status.
+                recorded = self._transition(job_id, ('running',), outcome)
+                db.session.commit()
+                if recorded:
+                    scrape_jobs_finished.labels(outcome['status']).inc()
+                else:
+                    logger.warning(f"Scrape job {job_id} for {name} finished after it timed out")
+        except Exception as e:
+            logger.error(f"Error running scrape job {job_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self._active.pop(key, None)
+                finished = self._finished.pop(job_id, None)
+            if finished is not None:
+                finished.set()
+
+    def _transition(self, job_id, from_statuses, values):
+        # UPDATE ... WHERE status IN from_statuses; True if the row changed.
+        return ScrapeJob.query.filter(
+            ScrapeJob.id == job_id,
+            ScrapeJob.status.in_(from_statuses)
+        ).update(values, synchronize_session=False) > 0
+
+scrape_jobs = ScrapeJobQueue()
@@ -0,0 +1,329 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import Config
+from database import db
+from models.player import Player
+from models.player_scouting_stat import PlayerScoutingStat
+from services.player_analyzer import PlayerAnalyzer
+
+logger = logging.getLogger(__name__)
+
+POSITION_CODES = {'FW': 0, 'MF': 1, 'DF': 2, 'GK': 3}
+MANIFEST = 'manifest.json'
+
+class SimilarityIndex:
+    def __init__(self, directory=None, stats=None, save_interval=None, sync_interval=None):
+        self.directory = directory or Config.SIMILARITY_INDEX_DIR
+        self.stats = list(stats or PlayerAnalyzer().stat_columns)
+        self.stat_columns = {stat: i for i, stat in enumerate(self.stats)}
+        self.save_interval = save_interval if save_interval is not None else Config.SIMILARITY_SAVE_INTERVAL_SECONDS
+        self.sync_interval = sync_interval if sync_interval is not None else Config.SIMILARITY_SYNC_INTERVAL_SECONDS
+
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._ids = None
+        self._positions = None
+        self._size = 0
+        self._rows = {}
+        self._loaded = False
+        self._version = None
+        self._pending = {}
+        self._save_timer = None
+        self._next_sync = 0.0
+
+    def vector(self, scouting_report):
+        # Percentiles centred on the median, so cosine similarity compares
+        # how a player stands out rather than raw magnitudes. Stats missing
+        # from the report count as average.
+        vector = np.zeros(len(self.stats), dtype=np.float32)
+        for row in scouting_report or []:
+            column = self.stat_columns.get(row.get('stat'))
+            percentile = row.get('percentile')
+            if column is not None and isinstance(percentile, (int, float)):
+                vector[column] = (percentile - 50) / 50
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def update(self, players):
+        entries = {}
+        for player in players:
+            vector = self.vector(player.scouting_report_list())
+            entries[player.id] = (vector, POSITION_CODES.get(player.position_base, -1)) if vector is not None else None
+
+        # The index is derived data; failing to update it must not fail the
+        # write that triggered it. The next rebuild picks the rows up.
+        try:
+            with self._lock:
+                self._ensure_loaded()
+                for player_id, entry in entries.items():
+                    self._apply(player_id, entry)
+        except Exception as e:
+            logger.error(f"Error updating similarity index: {str(e)}")
+
+    def remove(self, player_id):
+        with self._lock:
+            self._ensure_loaded()
+            self._apply(player_id, None)
+
+    def similar(self, player_id, k=None, same_position=False):
+        k = max(1, min(k or Config.SIMILARITY_DEFAULT_K, Config.SIMILARITY_MAX_K))
+
+        with self._lock:
+            self._ensure_loaded()
+            row = self._rows.get(player_id)
+            if row is None:
+                return None
+
+            vectors = self._vectors[:self._size]
+            scores = vectors @ vectors[row]
+            scores[row] = -np.inf
+            if same_position:
+                positions = self._positions[:self._size]
+                scores[positions != positions[row]] = -np.inf
+
+            k = min(k, self._size - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.isfinite(scores[top])]
+            top = top[np.lexsort((self._ids[top], -scores[top]))]
+            return [(int(self._ids[i]), round(float(scores[i]), 4)) for i in top]
+
+    def size(self):
+        with self._lock:
+            return self._size
+
+    def rebuild(self, batch_size=1000):
+        with self._lock, self._file_lock():
+            self._rebuild(batch_size)
+            self._save()
+            return self._size
+
+    def save(self):
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._loaded:
+                self._save()
+
+    def _ensure_loaded(self):
+        # Another worker's save is picked up within sync_interval; queries in
+        # between read the index this worker already has.
+        now = time.monotonic()
+        if self._loaded and now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+
+        with self._file_lock(fcntl.LOCK_SH):
+            manifest = self._read_manifest()
+            if manifest is not None and manifest.get('stats') == self.stats:
+                if manifest['version'] != self._version:
+                    self._load(manifest)
+                return
+
+        # Nothing usable on disk: build it, unless another worker does first.
+        with self._file_lock():
+            self._sync()
+
+    def _sync(self):
+        # Call with the exclusive file lock held. Picks up an index saved by
+        # another worker and replays the changes this worker has not written
+        # yet on top of it.
+        manifest = self._read_manifest()
+        if manifest is not None and manifest.get('stats') == self.stats:
+            if manifest['version'] != self._version:
+                self._load(manifest)
+        elif not self._loaded:
+            self._rebuild()
+            self._save()
+
+    def _rebuild(self, batch_size=1000):
+        self._reset(0)
+        self._pending = {}
+        last_id = 0
+        # Plain column rows in a session of its own: the build reads every
+        # scouting row, and ORM objects for all of them would cost far more
+        # than the vectors themselves.
+        with Session(db.engine) as session:
+            while True:
+                players = session.query(Player.id, Player.position_base, Player.scouting_report).filter(
+                    Player.id > last_id
+                ).order_by(Player.id).limit(batch_size).all()
+                if not players:
+                    break
+
+                reports = {}
+                rows = session.query(
+                    PlayerScoutingStat.player_id, PlayerScoutingStat.stat, PlayerScoutingStat.percentile
+                ).filter(PlayerScoutingStat.player_id.between(players[0].id, players[-1].id))
+                for player_id, stat, percentile in rows:
+                    reports.setdefault(player_id, []).append({'stat': stat, 'percentile': percentile})
+
+                for player_id, position_base, legacy_report in players:
+                    vector = self.vector(reports.get(player_id) or legacy_report)
+                    if vector is not None:
+                        self._put(player_id, vector, POSITION_CODES.get(position_base, -1))
+                last_id = players[-1].id
+
+        self._loaded = True
+
+    @contextmanager
+    def _file_lock(self, operation=fcntl.LOCK_EX):
+        # Exclusive for saves, so no worker overwrites an index another one
+        # has just written; shared for loads, so no save removes the files
+        # of a version while it is being opened.
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, 'lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, manifest):
+        version = manifest['version']
+        # Memory-mapped, so a worker starts serving without reading the whole
+        # matrix; the arrays are copied the first time this worker writes.
+        self._vectors = np.load(os.path.join(self.directory, f'vectors-{version}.npy'), mmap_mode='r')
+        self._ids = np.load(os.path.join(self.directory, f'ids-{version}.npy'), mmap_mode='r')
+        self._positions = np.load(os.path.join(self.directory, f'positions-{version}.npy'), mmap_mode='r')
+        self._size = len(self._ids)
+        self._rows = {player_id: row for row, player_id in enumerate(self._ids.tolist())}
+        self._version = version
+        self._loaded = True
+
+        for player_id, entry in self._pending.items():
+            if entry is None:
+                self._remove(player_id)
+            else:
+                self._put(player_id, *entry)
+
+    def _save(self):
+        # Call with the exclusive file lock held.
+        previous = self._read_manifest()
+        version = uuid.uuid4().hex
+        np.save(os.path.join(self.directory, f'vectors-{version}.npy'), np.asarray(self._vectors[:self._size]))
+        np.save(os.path.join(self.directory, f'ids-{version}.npy'), np.asarray(self._ids[:self._size]))
+        np.save(os.path.join(self.directory, f'positions-{version}.npy'), np.asarray(self._positions[:self._size]))
+
+        manifest_path = os.path.join(self.directory, MANIFEST)
+        with open(f'{manifest_path}.{version}', 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'stats': self.stats, 'size': self._size}, f)
+        os.replace(f'{manifest_path}.{version}', manifest_path)
+
+        self._version = version
+        self._pending = {}
+        self._remove_old_versions(previous.get('version') if previous else None)
+
+    def _remove_old_versions(self, previous):
+        # The version just replaced stays on disk for workers that read its
+        # manifest before the swap; anything older goes.
+        keep = {self._version, previous}
+        for name in os.listdir(self.directory):
+            stem, extension = os.path.splitext(name)
+            if extension != '.npy' or '-' not in stem:
+                continue
+            if stem.split('-', 1)[1] not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _apply(self, player_id, entry):
+        if entry is None:
+            self._remove(player_id)
+        else:
+            self._put(player_id, *entry)
+        self._pending[player_id] = entry
+
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_interval, self._flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        timer = self._save_timer
+        if timer is not None:
+            timer.cancel()
+            self._flush()
+
+    def _flush(self):
+        try:
+            with self._lock, self._file_lock():
+                self._save_timer = None
+                self._sync()
+                if self._pending:
+                    self._save()
+        except OSError as e:
+            logger.error(f"Error saving similarity index: {str(e)}")
+
+    def _reset(self, capacity):
+        self._vectors = np.zeros((capacity, len(self.stats)), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._positions = np.zeros(capacity, dtype=np.int8)
+        self._size = 0
+        self._rows = {}
+
+    def _writable(self, needed):
+        # Arrays loaded from disk are read-only maps; grow into fresh arrays
+        # with spare room so inserts stay amortized O(1).
+        capacity = len(self._ids)
+        if needed <= capacity and self._vectors.flags.writeable:
+            return
+
+        capacity = max(needed, capacity * 2 if needed > capacity else capacity, 64)
+        vectors = np.zeros((capacity, len(self.stats)), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        positions = np.zeros(capacity, dtype=np.int8)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+        positions[:self._size] = self._positions[:self._size]
+        self._vectors, self._ids, self._positions = vectors, ids, positions
+
+    def _put(self, player_id, vector, position):
+        row = self._rows.get(player_id)
+        if row is None:
+            self._writable(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._rows[player_id] = row
+        else:
+            self._writable(self._size)
+
+        self._vectors[row] = vector
+        self._ids[row] = player_id
+        self._positions[row] = position
+
+    def _remove(self, player_id):
+        row = self._rows.pop(player_id, None)
+        if row is None:
+            return False
+
+        self._writable(self._size)
+        last = self._size - 1
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._ids[row] = self._ids[last]
+            self._positions[row] = self._positions[last]
+            self._rows[int(self._ids[row])] = row
+        self._size = last
+        return True
+
+similarity_index = SimilarityIndex()
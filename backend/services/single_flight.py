@@ -0,0 +1,81 @@
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from config import Config
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+@contextmanager
+def advisory_lock(engine, key, poll_seconds=None):
+    # Session-level Postgres advisory lock held on a dedicated connection, so
+    # commits made through db.session while it is held cannot release it.
+    # Waiting is done by polling pg_try_advisory_lock: a waiter returns its
+    # connection between attempts, so threads queued behind a long scrape do
+    # not drain the pool.
+    poll_seconds = Config.SINGLE_FLIGHT_POLL_SECONDS if poll_seconds is None else poll_seconds
+    while True:
+        with try_advisory_lock(engine, key) as acquired:
+            if acquired:
+                yield
+                return
+        time.sleep(poll_seconds)
+
+@contextmanager
+def try_advisory_lock(engine, key):
+    # Like advisory_lock, but yields False straight away when another
+    # session holds the lock. Outside Postgres there is nothing to share it
+    # with and it always yields True.
+    if engine.dialect.name != 'postgresql':
+        yield True
+        return
+
+    lock_id = zlib.crc32(key.encode('utf-8'))
+    with engine.connect() as connection:
+        acquired = connection.execute(text('SELECT pg_try_advisory_lock(:lock_id)'), {'lock_id': lock_id}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(text('SELECT pg_advisory_unlock(:lock_id)'), {'lock_id': lock_id})
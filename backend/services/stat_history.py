@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from database import db
+from models.player_season_stat import SEASON_STAT_COLUMNS
+from models.player_stat_change import PlayerStatChange
+
+class StatHistory:
+    def flatten(self, player):
+        # Stat keys: "season.<competition>.<column>",
+        # "scouting.<stat>.per_90" / ".percentile", "overall_rating" and
+        # "potential_rating".
+        overview = player.player_overview or {}
+        values = {
+            'overall_rating': overview.get('overall_rating'),
+            'potential_rating': (overview.get('potential') or {}).get('potential_rating')
+        }
+        for row in player.season_stats:
+            for column, _ in SEASON_STAT_COLUMNS:
+                values[f"season.{row.competition}.{column}"] = getattr(row, column)
+        for row in player.scouting_stats:
+            values[f"scouting.{row.stat}.per_90"] = row.per_90
+            values[f"scouting.{row.stat}.percentile"] = row.percentile
+        return values
+
+    def record(self, players, captured_at=None):
+        # Call with the new values set and before the commit that stores
+        # them; the change rows go into the same transaction. Returns the
+        # number of rows written.
+        players = [player for player in players if player.id is not None]
+        if not players:
+            return 0
+
+        captured_at = captured_at or datetime.utcnow()
+        latest = self.latest_values([player.id for player in players])
+        changes = []
+        for player in players:
+            previous = latest.get(player.id, {})
+            current = self.flatten(player)
+            for stat in current.keys() | previous.keys():
+                value = current.get(stat)
+                if previous.get(stat) != value:
+                    changes.append({
+                        'player_id': player.id,
+                        'captured_at': captured_at,
+                        'stat': stat,
+                        'value': value
+                    })
+
+        if changes:
+            db.session.bulk_insert_mappings(PlayerStatChange, changes)
+        return len(changes)
+
+    def latest_values(self, player_ids):
+        latest = {}
+        for start in range(0, len(player_ids), 500):
+            last_change = select(func.max(PlayerStatChange.id)).where(
+                PlayerStatChange.player_id.in_(player_ids[start:start + 500])
+            ).group_by(PlayerStatChange.player_id, PlayerStatChange.stat)
+            rows = db.session.query(
+                PlayerStatChange.player_id, PlayerStatChange.stat, PlayerStatChange.value
+            ).filter(PlayerStatChange.id.in_(last_change))
+            for player_id, stat, value in rows:
+                latest.setdefault(player_id, {})[stat] = value
+        return latest
+
+    def stats(self, player_id):
+        return [
+            stat for (stat,) in db.session.query(PlayerStatChange.stat).filter(
+                PlayerStatChange.player_id == player_id
+            ).distinct().order_by(PlayerStatChange.stat)
+        ]
+
+    def series(self, player_id, stat, since=None, until=None):
+        # Served from the (player_id, stat, captured_at) index; the player
+        # row and its JSON documents are never loaded.
+        query = db.session.query(PlayerStatChange.captured_at, PlayerStatChange.value).filter(
+            PlayerStatChange.player_id == player_id,
+            PlayerStatChange.stat == stat
+        )
+        if since is not None:
+            query = query.filter(PlayerStatChange.captured_at >= since)
+        if until is not None:
+            query = query.filter(PlayerStatChange.captured_at < until)
+        return [
+            {'captured_at': captured_at.isoformat(), 'value': value}
+            for captured_at, value in query.order_by(PlayerStatChange.captured_at, PlayerStatChange.id)
+        ]
+
+stat_history = StatHistory()
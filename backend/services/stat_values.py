@@ -0,0 +1,37 @@
+def _clean(text):
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return text
+    return text.strip().replace(',', '').rstrip('%')
+
+def parse_int(text):
+    text = _clean(text)
+    try:
+        return int(text) if text is not None else None
+    except ValueError:
+        return None
+
+def parse_float(text):
+    text = _clean(text)
+    try:
+        return float(text) if text is not None else None
+    except ValueError:
+        return None
+
+def is_percent(text):
+    return isinstance(text, str) and text.strip().endswith('%')
+
+def format_int(value):
+    return f"{value:,}" if value is not None else ""
+
+def format_float(value, decimals, percent=False):
+    if value is None:
+        return ""
+    return f"{value:.{decimals}f}{'%' if percent else ''}"
+
+def source_text(text, rendered):
+    # The scraped text when rendering its parsed value does not give it back
+    # ("0" in a float column, a rate fbref shows with fewer decimals), so it
+    # can be served as scraped; None when the rendering matches.
+    return text if isinstance(text, str) and text != rendered else None
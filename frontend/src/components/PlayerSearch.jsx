@@ -4,6 +4,54 @@ import "../styles/NeonLoader.css";
 import NeonLoader from "./NeonLoader";
 import PlayerProfile from "./PlayerProfile";
 
+const API_URL = "http://localhost:8000";
+const POLL_INTERVAL_MS = 1000;
+
+const pollJob = async (statusUrl) => {
+  while (true) {
+    const response = await fetch(`${API_URL}${statusUrl}`);
+    const job = await response.json();
+    if (!job.success) return job;
+    if (job.data.status === "done") return job.data.result;
+    if (job.data.status === "failed") {
+      return { success: false, error: job.data.error || "Failed to fetch player" };
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+};
+
+// Players we have not stored yet are fetched in the background: poll the
+// job. The server only offers an events_url when its workers can afford to
+// hold streams open; then follow the job over server-sent events and fall
+// back to polling if the stream drops.
+const waitForJob = ({ status_url: statusUrl, events_url: eventsUrl }) =>
+  new Promise((resolve) => {
+    if (!eventsUrl || !window.EventSource) {
+      resolve(pollJob(statusUrl));
+      return;
+    }
+
+    const source = new EventSource(`${API_URL}${eventsUrl}`);
+    const fallBack = () => {
+      source.close();
+      resolve(pollJob(statusUrl));
+    };
+
+    source.addEventListener("status", (event) => {
+      const job = JSON.parse(event.data);
+      if (job.status === "done") {
+        source.close();
+        resolve(job.result);
+      } else if (job.status === "failed") {
+        source.close();
+        resolve({ success: false, error: job.error || "Failed to fetch player" });
+      }
+    });
+    source.addEventListener("timeout", fallBack);
+    source.addEventListener("gone", fallBack);
+    source.onerror = fallBack;
+  });
+
 const PlayerSearch = () => {
   const [searchQuery, setSearchQuery] = useState("");
   const [isLoading, setIsLoading] = useState(false);
@@ -25,18 +73,16 @@ const PlayerSearch = () => {
     setPlayerData(null);
 
     try {
-      const timer = new Promise((resolve) => setTimeout(resolve, 1500));
-
-      const [response] = await Promise.all([
-        fetch(
-          `http://localhost:8000/api/player/search?name=${encodeURIComponent(
-            searchQuery.trim()
-          )}`
-        ),
-        timer,
-      ]);
-
-      const data = await response.json();
+      const response = await fetch(
+        `${API_URL}/api/player/search?name=${encodeURIComponent(
+          searchQuery.trim()
+        )}`
+      );
+
+      let data = await response.json();
+      if (response.status === 202) {
+        data = await waitForJob(data.data);
+      }
 
       if (data.success) {
         setSearchStatus("success");